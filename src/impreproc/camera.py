@@ -486,7 +486,7 @@ class Calibration:
             logging.error("Unable to get sensor Focal length from EXIF data.")
             return None
         try:
-            sensor_width_db = sens_db.SensorWidthDatabase()
+            sensor_width_db = sens_db.get_sensor_width_database()
             sensor_width_mm = sensor_width_db.lookup(
                 exif["Image Make"].printable,
                 exif["Image Model"].printable,
@@ -2,6 +2,7 @@ import logging
 import os
 import platform
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Union
 
@@ -9,6 +10,9 @@ from tqdm import tqdm
 
 from impreproc.images import ImageList
 
+# Path to the RawTherapee executable, found once per session by find_rawtherapee
+_RAWTHERAPEE_PATH = None
+
 
 class RawConverter:
     """
@@ -50,6 +54,7 @@ class RawConverter:
         opts: List[str] = [],
         keep_dir_tree: bool = False,
         image_list: ImageList = None,
+        rawtherapee_path: Union[str, Path] = None,
     ):
         """
         Initializes the RawConverter object.
@@ -60,6 +65,7 @@ class RawConverter:
             keep_dir_tree (bool, optional): A flag indicating whether to preserve the directory structure of the input files in the output directory. If True, the converted images will be saved in subdirectories of the output directory corresponding to the relative paths of the input files. Defaults to False.
             image_list (ImageList): A list of paths to raw image files. Defaults to None.
             opts: Additional options to pass to RawTherapee, e.g. ("-j100", "-Y"). See the documentation of convert_raw function for all the details.
+            rawtherapee_path (Union[str, Path], optional): Path to the RawTherapee executable. Defaults to None, which finds it with find_rawtherapee at the first conversion.
 
         NOTE:
             image_list shuld be set only in convert method. Kept int __init__ for backward compatibility.
@@ -69,6 +75,7 @@ class RawConverter:
         self.keep_dir_tree = keep_dir_tree
         self.opts = opts
         self.image_list = image_list
+        self.rawtherapee_path = rawtherapee_path
 
         if self.output_dir.exists():
             logging.warning(
@@ -80,35 +87,55 @@ class RawConverter:
     def convert(
         self,
         image_list: ImageList,
+        max_workers: int = None,
     ) -> bool:
         """
         Converts the raw image files to the specified format using RawTherapee.
 
+        Each file is converted by a separate rawtherapee-cli process and several processes run concurrently, started by a pool of threads (which just wait for them to complete).
+
         Args:
             image_list (ImageList): A list of paths to raw image files.
+            max_workers (int, optional): Maximum number of concurrent conversions. Defaults to None, which uses a quarter of the CPUs, as RawTherapee is itself multithreaded.
 
         Returns:
             bool: True if all files were converted successfully, False otherwise.
         """
         self.image_list = image_list
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 1) // 4)
 
+        # Find the RawTherapee executable once for all the files
+        if self.rawtherapee_path is None:
+            self.rawtherapee_path = find_rawtherapee()
+
+        files = list(self.image_list)
         if not self.keep_dir_tree:
-            for file in tqdm(self.image_list):
-                if not convert_raw(
+            dest_paths = [self.output_dir] * len(files)
+        else:
+            dest_paths = rebuild_dir_tree(files, self.output_dir)
+            for dest in set(dest_paths):
+                dest.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    convert_raw,
                     file,
-                    output_path=self.output_dir,
+                    output_path=dest,
                     profile_path=self.pp3_path,
+                    rawtherapee_path=self.rawtherapee_path,
                     opts=self.opts,
-                ):
-                    raise RuntimeError(f"Unable to convert file {file.name}")
-        else:
-            dest_paths = rebuild_dir_tree(self.image_list, self.output_dir)
-            for file, dest in tqdm(zip(self.image_list, dest_paths)):
-                dest.mkdir(parents=True, exist_ok=True)
-                if not convert_raw(
-                    file, output_path=dest, profile_path=self.pp3_path, opts=self.opts
-                ):
-                    raise RuntimeError(f"Unable to convert file {file.name}")
+                    make_output_dir=False,
+                ): file
+                for file, dest in zip(files, dest_paths)
+            }
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                if not future.result():
+                    # Do not start the conversions still waiting
+                    for f in futures:
+                        f.cancel()
+                    raise RuntimeError(f"Unable to convert file {futures[future].name}")
         return True
 
 
@@ -118,6 +145,8 @@ def convert_raw(
     profile_path: Union[str, Path] = None,
     rawtherapee_path: Union[str, Path] = None,
     opts: List[str] = [],
+    verbose: bool = False,
+    make_output_dir: bool = True,
 ) -> bool:
     """
     Converts a raw image file to a specified format using RawTherapee.
@@ -126,7 +155,10 @@ def convert_raw(
         fname (Union[str, Path]): Path to the raw image file to convert.
         output_path (Union[str, Path], optional): Directory to save the converted file(s). Defaults to "converted" in the current working directory.
         profile_path (Union[str, Path], optional): Path to a processing profile (pp3) file to use for the conversion. Defaults to None.
+        rawtherapee_path (Union[str, Path], optional): Path to the RawTherapee executable. Defaults to None, which uses find_rawtherapee.
         opts: Additional string arguments to pass to RawTherapee. A comprehensive list of possible arguments can be found in the RawTherapee documentation at https://rawpedia.rawtherapee.com/Command-Line_Options
+        verbose (bool, optional): If True, the output of RawTherapee is captured and logged if the conversion fails. Otherwise it is discarded without being buffered. Defaults to False.
+        make_output_dir (bool, optional): Whether to create output_path if it does not exist. Set it to False if the directory is created beforehand (as RawConverter does), to save a system call per file. Defaults to True.
 
     Returns:
         bool: True if the conversion was successful, False otherwise.
@@ -159,7 +191,8 @@ def convert_raw(
     else:
         assert Path(rawtherapee_path).exists(), "Invalid RawTherapee Path"
 
-    Path(output_path).mkdir(exist_ok=True)
+    if make_output_dir:
+        Path(output_path).mkdir(exist_ok=True)
 
     # Define base command
     cmd = [
@@ -187,14 +220,17 @@ def convert_raw(
     cmd.append(str(fname))
 
     # Run Conversion with RawTherapee
-    res = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-    )
+    if verbose:
+        res = subprocess.run(cmd, capture_output=True, text=True)
+    else:
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     if res.returncode == 0:
         return True
     else:
+        if verbose:
+            logging.error(
+                f"RawTherapee failed to convert {fname}:\n{res.stdout}\n{res.stderr}"
+            )
         return False
 
 
@@ -225,6 +261,7 @@ def find_rawtherapee() -> str:
     """
     Find the path of the RawTherapee executable on the current operating system.
     If the path is not found automatically, a file dialog window will open to allow the user to select the executable manually.
+    The path found is kept for the rest of the session, so the search (and the dialog) is done only once.
 
     Returns:
         str: Path to RawTherapee executable
@@ -233,6 +270,10 @@ def find_rawtherapee() -> str:
         OSError: If the operating system is not supported
     """
 
+    global _RAWTHERAPEE_PATH
+    if _RAWTHERAPEE_PATH:
+        return _RAWTHERAPEE_PATH
+
     def select_path_gui():
         import tkinter as tk
         from tkinter import filedialog
@@ -247,7 +288,10 @@ def find_rawtherapee() -> str:
     if system == "Linux":
         # Get path to RawTherapee executable
         rawtherapee_path = subprocess.run(
-            ["which", "rawtherapee-cli"], capture_output=True, text=True
+            ["which", "rawtherapee-cli"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
         ).stdout.replace("\n", "")
         if rawtherapee_path == "":
             logging.warning(
@@ -278,6 +322,10 @@ def find_rawtherapee() -> str:
     else:
         raise OSError(f"Unsupported operating system: {system}")
 
+    # Do not keep an empty path (e.g., if the dialog was cancelled)
+    if rawtherapee_path:
+        _RAWTHERAPEE_PATH = rawtherapee_path
+
     return rawtherapee_path
 
 
@@ -1,13 +1,15 @@
 import logging
-import platform
-import re
-from copy import deepcopy
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from importlib import import_module
+from math import isnan
 from pathlib import Path
-from typing import List, TypedDict, Union
+from typing import Callable, List, TypedDict, Union
 
 import numpy as np
+import pandas as pd
 import pyproj
 import xlsxwriter
 
@@ -41,6 +43,7 @@ class DataDict(TypedDict):
 class ExifData(TypedDict):
     id: int
     name: str
+    basename: str
     path: str
     date: str
     time: str
@@ -65,6 +68,80 @@ class MrkData(TypedDict):
     Flag: float
 
 
+# EPSG codes of WGS84 and of the WGS84 / UTM zones (north and south)
+EPSG_WGS84 = 4326
+EPSG_WGS84_UTM = frozenset(range(32601, 32661)) | frozenset(range(32701, 32761))
+
+# Fields of MrkData and the corresponding columns of a .mrk line, once tabs and
+# pipes are mapped to commas (see mrkread_array)
+MRK_DTYPE = np.dtype(
+    [
+        ("id", np.int64),
+        ("clock_time", np.float64),
+        ("dE", np.float64),
+        ("dN", np.float64),
+        ("dV", np.float64),
+        ("lat", np.float64),
+        ("lon", np.float64),
+        ("ellh", np.float64),
+        ("stdE", np.float64),
+        ("stdN", np.float64),
+        ("stdV", np.float64),
+        ("Qual", np.float64),
+        ("Flag", "U8"),
+    ]
+)
+MRK_USECOLS = (0, 1, 3, 5, 7, 9, 11, 13, 15, 16, 17, 18, 19)
+
+# Numeric columns of the EXIF and LOG sheets written by dji2xlsx, as
+# (header, field, number format, scale). "{zone}" is replaced by the UTM zone
+# and the values are divided by scale (dE, dN, dV are stored in mm in the .mrk)
+XLSX_EXIF_COLUMNS = [
+    ("Lon [deg]", "lon_exif", "0.00000000", 1),
+    ("Lat [deg]", "lat_exif", "0.00000000", 1),
+    ("h [m]", "ellh_exif", "0.000", 1),
+]
+XLSX_EXIF_UTM_COLUMNS = [
+    ("East UTM{zone} [m]", "E_exif", "0.000", 1),
+    ("North UTM{zone} [m]", "N_exif", "0.000", 1),
+    ("h UTM{zone} [m]", "h_exif", "0.000", 1),
+]
+XLSX_LOG_COLUMNS = [
+    ("Lon [deg]", "lon_mrk", "0.00000000", 1),
+    ("Lat [deg]", "lat_mrk", "0.00000000", 1),
+    ("h [m]", "ellh_mrk", "0.000", 1),
+]
+XLSX_LOG_UTM_COLUMNS = [
+    ("East UTM{zone} [m]", "E_mrk", "0.000", 1),
+    ("North UTM{zone} [m]", "N_mrk", "0.000", 1),
+    ("h UTM{zone} [m]", "h_mrk", "0.000", 1),
+]
+XLSX_LOG_QUALITY_COLUMNS = [
+    ("ESDV [m]", "stdE_mrk", "0.000", 1),
+    ("NSDV [m]", "stdN_mrk", "0.000", 1),
+    ("VSDV [m]", "stdV_mrk", "0.000", 1),
+    ("dE [m]", "dE_mrk", "0.000", 1000),
+    ("dN [m]", "dN_mrk", "0.000", 1000),
+    ("dV [m]", "dV_mrk", "0.000", 1000),
+    ("Quality", "Qual_mrk", "0", 1),
+]
+
+# Minimum number of images read by each process when parsing EXIF data with exifread
+MIN_IMAGES_PER_PROCESS = 32
+
+# Tags requested to ExifTool by get_images_exiftool
+EXIFTOOL_TAGS = [
+    "EXIF:DateTimeOriginal",
+    "EXIF:ModifyDate",
+    "EXIF:GPSLatitudeRef",
+    "EXIF:GPSLatitude",
+    "EXIF:GPSLongitudeRef",
+    "EXIF:GPSLongitude",
+    "EXIF:GPSAltitudeRef",
+    "EXIF:GPSAltitude",
+]
+
+
 # Functions
 
 
@@ -72,13 +149,14 @@ def get_dji_id_from_name(fname: str) -> int:
     """Extracts the DJI image progressive ID from the given image filename.
 
     Args:
-        fname (str): The image filename from which to extract the DJI image ID.
+        fname (str): The image filename (or path) from which to extract the DJI image ID.
 
     Returns:
         int: The extracted DJI image ID.
     """
-    fname = Path(fname)
-    return int(fname.stem.split("_")[-1])
+    # Plain string operations (no Path or splitext), as this runs for every image
+    stem, dot, ext = os.path.basename(fname).rpartition(".")
+    return int((stem if dot else ext).rpartition("_")[2])
 
 
 def mrkread(fname: Union[Path, str]) -> dict:
@@ -94,45 +172,116 @@ def mrkread(fname: Union[Path, str]) -> dict:
     Raises:
         AssertionError: If the file does not exist or is not a .mrk file.
 
+    """
+    arr = mrkread_array(fname)
+
+    # Build the MrkData rows from the columns (converted to python scalars)
+    fields = MRK_DTYPE.names
+    columns = [arr[field].tolist() for field in fields]
+    outdata = {row[0]: dict(zip(fields, row)) for row in zip(*columns)}
+
+    return outdata
+
+
+@lru_cache(maxsize=8)
+def _mrkread_cached(fname: str, mtime_ns: int) -> dict:
+    return mrkread(fname)
+
+
+def mrkread_cached(fname: Union[Path, str]) -> dict:
+    """Parse a .mrk file as mrkread, caching the result on the path and modification time of the file, so that the same file is parsed again only if it changes (e.g., when converting it several times with different options).
+
+    The returned dictionary is shared by all the calls with the same file and must not be modified.
+
+    Args:
+        fname (Union[Path, str]): Path to the .mrk file.
+
+    Returns:
+        dict: Dictionary containing the data parsed from the .mrk file (see mrkread).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        AssertionError: If the file is not a .mrk file.
+    """
+    return _mrkread_cached(str(fname), os.stat(fname).st_mtime_ns)
+
+
+def mrkread_array(fname: Union[Path, str]) -> np.ndarray:
+    """Parse a .mrk file into a structured numpy array.
+
+    The whole file is parsed by numpy in a single call, without building a python object for each row. The array has one record per line of the file and the fields of MrkData (see MRK_DTYPE).
+
+    Args:
+        fname (Union[Path, str]): Path to the .mrk file.
+
+    Returns:
+        np.ndarray: Structured array with dtype MRK_DTYPE.
+
+    Raises:
+        AssertionError: If the file does not exist or is not a .mrk file.
+
     """
     # check if the file exists and is a .mrk file
     fname = Path(fname)
     assert fname.exists(), f"File {fname} does not exist"
     assert fname.suffix.lower() == ".mrk", f"File {fname} is not a .mrk file"
 
-    # open the file and parse each row using , as separator
+    # Map tabs and pipes to commas line by line while numpy parses all the
+    # lines in a single call: the lines are streamed from the file, so neither
+    # the whole text nor the list of its lines is kept in memory. Memory-mapping
+    # the file would not save any copy, as the delimiters must be rewritten
+    # before parsing anyway.
     with open(fname, "r") as fid:
-        indata = [re.split(",|\t|[|]|\n", i) for i in fid.readlines()]
-
-    outdata = {}
-    for line in indata:
-        id = int("%03d" % np.float_(line[0]))
-        data = MrkData(
-            id=id,
-            clock_time=np.float_(line[1]),
-            lat=np.float_(line[9]),
-            lon=np.float_(line[11]),
-            ellh=np.float_(line[13]),
-            stdE=np.float_(line[15]),
-            stdN=np.float_(line[16]),
-            stdV=np.float_(line[17]),
-            dE=np.float_(line[3]),
-            dN=np.float_(line[5]),
-            dV=np.float_(line[7]),
-            Qual=np.float_(line[18]),
-            Flag=line[19],
+        arr = np.loadtxt(
+            (line.replace("\t", ",").replace("|", ",") for line in fid),
+            delimiter=",",
+            dtype=MRK_DTYPE,
+            usecols=MRK_USECOLS,
+            ndmin=1,
         )
-        outdata[id] = data
 
-    return outdata
+    return arr
 
 
-def get_images(folder: Union[str, Path], image_ext: str) -> dict:
+def mrkread_columns(fname: Union[Path, str]) -> dict:
+    """Parse a .mrk file into a dictionary of arrays (one contiguous array per field).
+
+    This structure-of-arrays layout is meant for vectorized processing of the MRK data (e.g., projecting all the positions with a single call to `get_transformer(...).transform_parallel(data["lat"], data["lon"])`).
+
+    Args:
+        fname (Union[Path, str]): Path to the .mrk file.
+
+    Returns:
+        dict: Dictionary with the MrkData field names as keys and 1D numpy arrays (aligned with the "id" array) as values.
+
+    Raises:
+        AssertionError: If the file does not exist or is not a .mrk file.
+
+    """
+    arr = mrkread_array(fname)
+
+    return {field: np.ascontiguousarray(arr[field]) for field in MRK_DTYPE.names}
+
+
+def get_images(
+    folder: Union[str, Path],
+    image_ext: str,
+    use_exiftool: bool = True,
+    max_workers: int = None,
+    use_processes: bool = True,
+    progress_callback: Callable[[int, int], None] = None,
+) -> dict:
     """Read image files and extract EXIF data from them.
 
+    The images with the given extension are listed and their EXIF data are read with read_images_exif (see it for the details on how the files are parsed).
+
     Args:
         folder (Union[str, Path]): Path to the folder containing the images.
         image_ext (str): Extension of the image files to read.
+        use_exiftool (bool, optional): Read EXIF data with ExifTool in batch mode. Defaults to True.
+        max_workers (int, optional): Maximum number of processes (or threads) used to read the EXIF data with exifread. Defaults to None (number of CPUs).
+        use_processes (bool, optional): Use a pool of processes to read the EXIF data with exifread. A pool of threads gives a smaller speed-up (exifread is pure python), but it does not need to start new interpreters, which re-import the __main__ module on Windows (e.g., a GUI). Defaults to True.
+        progress_callback (Callable[[int, int], None], optional): Function called with the number of images read so far and the total number of images, as the images are read (e.g., to update a progress bar). Defaults to None.
 
     Returns:
         dict: Dictionary containing the EXIF data extracted from the images. The dictionary keys are the
@@ -141,18 +290,164 @@ def get_images(folder: Union[str, Path], image_ext: str) -> dict:
     """
     files = ImageList(folder, image_ext=image_ext, recursive=False)
 
+    return read_images_exif(
+        files,
+        use_exiftool=use_exiftool,
+        max_workers=max_workers,
+        use_processes=use_processes,
+        progress_callback=progress_callback,
+    )
+
+
+def read_images_exif(
+    files: List[Path],
+    use_exiftool: bool = True,
+    max_workers: int = None,
+    use_processes: bool = True,
+    progress_callback: Callable[[int, int], None] = None,
+) -> dict:
+    """Extract EXIF data from a list of images.
+
+    If `use_exiftool` is True and pyexiftool is available, the EXIF tags of all the images are read with a single ExifTool process in batch mode. Otherwise (or if ExifTool fails), each image is parsed with exifread, distributing the images over a pool of processes (or of threads, if `use_processes` is False).
+
+    Args:
+        files (List[Path]): List of paths to the images.
+        use_exiftool (bool, optional): Read EXIF data with ExifTool in batch mode. Defaults to True.
+        max_workers (int, optional): Maximum number of processes (or threads) used to read the EXIF data with exifread. Defaults to None (number of CPUs).
+        use_processes (bool, optional): Use a pool of processes (instead of threads) to read the EXIF data with exifread (see get_images). Defaults to True.
+        progress_callback (Callable[[int, int], None], optional): Function called with the number of images read so far and the total number of images, as the images are read. Defaults to None.
+
+    Returns:
+        dict: Dictionary containing the EXIF data extracted from the images. The dictionary keys are the
+        point IDs and the values are instances of the ExifData class.
+
+    """
+    if use_exiftool:
+        try:
+            import_module("exiftool")
+        except ImportError:
+            # pyexiftool is an optional dependency: use exifread silently
+            logger.debug(
+                "pyexiftool is not installed. Reading EXIF data with exifread."
+            )
+            use_exiftool = False
+    if use_exiftool:
+        try:
+            exifdata = get_images_exiftool(files)
+            if progress_callback is not None:
+                progress_callback(len(exifdata), len(exifdata))
+            return exifdata
+        except Exception as e:
+            logger.warning(
+                f"Unable to read EXIF data with ExifTool: {e}. Falling back to exifread."
+            )
+
+    files = [Path(f) for f in files]
+    exifdata = {}
+
+    def collect(results):
+        # Store the results as they are returned by the workers (in order)
+        for i, (file, (id, data, error)) in enumerate(zip(files, results), start=1):
+            if error is not None:
+                logger.error(f"Error reading file {file}: {error}")
+            exifdata[id] = data
+            if progress_callback is not None:
+                progress_callback(i, len(files))
+
+    n_workers = min(max_workers or os.cpu_count(), len(files) // MIN_IMAGES_PER_PROCESS)
+    if n_workers > 1:
+        try:
+            pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with pool(max_workers=n_workers) as executor:
+                collect(
+                    executor.map(
+                        _read_exif_data, files, chunksize=MIN_IMAGES_PER_PROCESS
+                    )
+                )
+            return exifdata
+        except Exception as e:
+            logger.warning(
+                f"Unable to read EXIF data in parallel: {e}. Reading images sequentially."
+            )
+
+    collect(map(_read_exif_data, files))
+
+    return exifdata
+
+
+def _read_exif_data(file: Path) -> tuple:
+    """Read the EXIF data of a single image with exifread (worker of get_images).
+
+    Errors are returned instead of being logged, as the function may run in a child process.
+
+    Args:
+        file (Path): Path to the image.
+
+    Returns:
+        tuple: The image id, the ExifData of the image (None if it could not be read) and the error message (None on success).
+    """
+    id = None
+    try:
+        id = get_dji_id_from_name(file)
+        img = Image(file)
+        lat, lon, ellh = latlonalt_from_exif(img.exif)
+        data = ExifData(
+            id=id,
+            name=file.stem,
+            basename=file.name,
+            path=str(file),
+            date=img.date,
+            time=img.time,
+            lat=lat,
+            lon=lon,
+            ellh=ellh,
+        )
+        return id, data, None
+    except Exception as e:
+        return id, None, str(e)
+
+
+def get_images_exiftool(files: List[Path]) -> dict:
+    """Extract EXIF data from a list of images with a single ExifTool process.
+
+    Only the tags listed in EXIFTOOL_TAGS are requested to ExifTool, which runs in stay-open mode and parses all the files in one batch.
+
+    Args:
+        files (List[Path]): List of paths to the images.
+
+    Returns:
+        dict: Dictionary containing the EXIF data extracted from the images. The dictionary keys are the
+        point IDs and the values are instances of the ExifData class.
+
+    Raises:
+        ImportError: If pyexiftool is not installed.
+        FileNotFoundError: If the ExifTool executable is not found.
+    """
+    exiftool = import_module("exiftool")
+
+    files = [Path(f) for f in files]
+    if not files:
+        return {}
+    with exiftool.ExifToolHelper() as et:
+        metadata = et.get_tags([str(f) for f in files], tags=EXIFTOOL_TAGS)
+
     exifdata = {}
-    for file in files:
+    for file, tags in zip(files, metadata):
+        # Errors (including names without a DJI id) are reported per file, as
+        # in _read_exif_data, without discarding the whole batch
+        id = None
         try:
-            img = Image(file)
             id = get_dji_id_from_name(file)
-            lat, lon, ellh = latlonalt_from_exif(img.exif)
+            lat, lon, ellh = latlonalt_from_exiftool(tags)
+            date_time = tags.get("EXIF:DateTimeOriginal", tags.get("EXIF:ModifyDate"))
+            date, time = date_time.split(" ")
             data = ExifData(
                 id=id,
                 name=file.stem,
+                basename=file.name,
                 path=str(file),
-                date=img.date,
-                time=img.time,
+                date=date,
+                time=time,
                 lat=lat,
                 lon=lon,
                 ellh=ellh,
@@ -165,6 +460,35 @@ def get_images(folder: Union[str, Path], image_ext: str) -> dict:
     return exifdata
 
 
+def latlonalt_from_exiftool(tags: dict) -> tuple:
+    """Extracts the latitude, longitude, and altitude from the tags returned by ExifTool.
+
+    Args:
+        tags (dict): The tags of one image as returned by `ExifToolHelper.get_tags` (with numerical values).
+
+    Returns:
+        tuple: A tuple containing the latitude (float), longitude (float), and altitude (float).
+
+    Raises:
+        AssertionError: If the latitude or longitude reference is not North or East, respectively, or if the altitude reference is not WGS84.
+    """
+    assert (
+        tags["EXIF:GPSLatitudeRef"] == "N"
+    ), "Latitude Reference is not North. Unable to process image."
+    assert (
+        tags["EXIF:GPSLongitudeRef"] == "E"
+    ), "Longitude Reference is not East. Unable to process image."
+    assert (
+        tags["EXIF:GPSAltitudeRef"] == 0
+    ), "Altitude Reference is not WGS84. Unable to process image."
+
+    lat = float(tags["EXIF:GPSLatitude"])
+    lon = float(tags["EXIF:GPSLongitude"])
+    alt = float(tags["EXIF:GPSAltitude"])
+
+    return (lat, lon, alt)
+
+
 def merge_mrk_exif_data(mrk_dict: dict, exif_dict: dict) -> dict:
     """Merge MRK and EXIF data dictionaries.
 
@@ -181,38 +505,131 @@ def merge_mrk_exif_data(mrk_dict: dict, exif_dict: dict) -> dict:
 
     """
     merged_dict = {}
-    for key in mrk_dict.keys():
-        if key in exif_dict.keys():
-            data = {
-                "id": mrk_dict[key]["id"],
-                "clock_time_mrk": mrk_dict[key]["clock_time"],
-                "lat_mrk": mrk_dict[key]["lat"],
-                "lon_mrk": mrk_dict[key]["lon"],
-                "ellh_mrk": mrk_dict[key]["ellh"],
-                "stdE_mrk": mrk_dict[key]["stdE"],
-                "stdN_mrk": mrk_dict[key]["stdN"],
-                "stdV_mrk": mrk_dict[key]["stdV"],
-                "dE_mrk": mrk_dict[key]["dE"],
-                "dN_mrk": mrk_dict[key]["dN"],
-                "dV_mrk": mrk_dict[key]["dV"],
-                "Qual_mrk": mrk_dict[key]["Qual"],
-                "Flag_mrk": mrk_dict[key]["Flag"],
-                "name_exif": exif_dict[key]["name"],
-                "path_exif": exif_dict[key]["path"],
-                "date_exif": exif_dict[key]["date"],
-                "time_exif": exif_dict[key]["time"],
-                "lat_exif": exif_dict[key]["lat"],
-                "lon_exif": exif_dict[key]["lon"],
-                "ellh_exif": exif_dict[key]["ellh"],
-            }
-            merged_dict[key] = data
-        else:
+    for key, mrk in mrk_dict.items():
+        exif = exif_dict.get(key)
+        if exif is None:
             merged_dict[key] = None
             logger.warning(f"Image {key} not found in EXIF data.")
+            continue
+        # All the MRK and EXIF fields (but the id) are copied with a suffix
+        merged_dict[key] = {
+            "id": mrk["id"],
+            **{f"{k}_mrk": v for k, v in mrk.items() if k != "id"},
+            **{f"{k}_exif": v for k, v in exif.items() if k != "id"},
+        }
 
     return merged_dict
 
 
+def columns_from_rows(data_dict: dict) -> dict:
+    """Convert a dictionary of data rows into a dictionary of arrays (one array per field).
+
+    Rows that are None (e.g., images whose EXIF data could not be read) are skipped.
+
+    Args:
+        data_dict (dict): Dictionary with the data rows (e.g., the EXIF data returned by get_images).
+
+    Returns:
+        dict: Dictionary with the field names as keys and 1D numpy arrays (aligned with the "id" array) as values.
+    """
+    rows = [row for row in data_dict.values() if row is not None]
+    if not rows:
+        return {}
+
+    return {field: np.array([row[field] for row in rows]) for field in rows[0]}
+
+
+def merge_mrk_exif_columns(mrk_columns: dict, exif_columns: dict) -> dict:
+    """Merge MRK and EXIF data stored as dictionaries of arrays.
+
+    Vectorized counterpart of merge_mrk_exif_data: the records are matched by id with a single set intersection, and each field is gathered with one indexing operation. Only the ids found in both the MRK and EXIF data are kept, sorted by id.
+
+    Args:
+        mrk_columns (dict): MRK data as returned by mrkread_columns.
+        exif_columns (dict): EXIF data as dictionary of arrays (e.g., columns_from_rows(get_images(...))).
+
+    Returns:
+        dict: Dictionary with the "id" array and the MRK and EXIF fields (with suffix "_mrk" and "_exif", respectively) as arrays aligned with it.
+    """
+    assert (
+        "id" in mrk_columns and "id" in exif_columns
+    ), "Invalid input data: both the MRK and EXIF data must have an 'id' field."
+    mrk_ids = np.asarray(mrk_columns["id"])
+    exif_ids = np.asarray(exif_columns["id"])
+
+    missing = np.setdiff1d(mrk_ids, exif_ids)
+    if missing.size:
+        logger.warning(
+            f"{missing.size} images not found in EXIF data: {missing.tolist()}"
+        )
+
+    ids, mrk_idx, exif_idx = np.intersect1d(
+        mrk_ids, exif_ids, assume_unique=True, return_indices=True
+    )
+
+    return {
+        "id": ids,
+        **{
+            f"{k}_mrk": np.asarray(v)[mrk_idx]
+            for k, v in mrk_columns.items()
+            if k != "id"
+        },
+        **{
+            f"{k}_exif": np.asarray(v)[exif_idx]
+            for k, v in exif_columns.items()
+            if k != "id"
+        },
+    }
+
+
+def merge_mrk_exif_dataframe(mrk_columns: dict, exif_columns: dict) -> pd.DataFrame:
+    """Merge MRK and EXIF data stored as dictionaries of arrays into a pandas DataFrame.
+
+    The columns are the same as those returned by merge_mrk_exif_columns, and the DataFrame is indexed by image id.
+
+    Args:
+        mrk_columns (dict): MRK data as returned by mrkread_columns.
+        exif_columns (dict): EXIF data as dictionary of arrays (e.g., columns_from_rows(get_images(...))).
+
+    Returns:
+        pd.DataFrame: DataFrame with the merged MRK and EXIF data, indexed by image id.
+    """
+    merged = merge_mrk_exif_columns(mrk_columns, exif_columns)
+    ids = merged.pop("id")
+
+    return pd.DataFrame(merged, index=pd.Index(ids, name="id"))
+
+
+def copy_data_dict(data_dict: dict) -> dict:
+    """Returns a copy of a dictionary of MRK/EXIF data rows.
+
+    The rows are flat dictionaries of numbers and strings (or None), so a shallow copy of each row is enough to get an independent copy, without the overhead of copy.deepcopy.
+
+    Args:
+        data_dict (dict): Dictionary with the data rows (e.g., as returned by merge_mrk_exif_data).
+
+    Returns:
+        dict: A copy of data_dict.
+    """
+    return {k: (dict(v) if v is not None else None) for k, v in data_dict.items()}
+
+
+@lru_cache(maxsize=32)
+def get_transformer(epsg_from: int, epsg_to: int) -> Transformer:
+    """Returns a Transformer between the two EPSG codes, cached so that it is built only once for each pair of CRS.
+
+    The coordinates follow the axis order of the EPSG definitions (e.g., lat, lon for EPSG:4326 and E, N for UTM), as in Transformer.transform.
+
+    Args:
+        epsg_from (int): EPSG code of the source CRS.
+        epsg_to (int): EPSG code of the target CRS.
+
+    Returns:
+        Transformer: Transformer object from epsg_from to epsg_to.
+    """
+    return Transformer(epsg_from=epsg_from, epsg_to=epsg_to)
+
+
 def project_to_utm(
     epsg_from: int,
     epsg_to: int,
@@ -220,6 +637,7 @@ def project_to_utm(
     fields: List[str] = ["lat", "lon"],
     suffix: str = "",
     in_place: bool = False,
+    max_workers: int = None,
 ) -> Union[dict, None]:
     """
     Converts geographic coordinates (latitude, longitude) to projected UTM coordinates using the pyproj library.
@@ -231,81 +649,194 @@ def project_to_utm(
         fields (List[str], optional): List of two fields specifying the names of the latitude and longitude fields in the data dictionary, respectively. Default is ["lat", "lon"].
         suffix (str): Suffix to be appended to the new fields in the data dictionary. Default is "".
         in_place (bool, optional): If True, the projection is applied in-place to the data_dict. If False, a new dictionary with the projected coordinates is returned. Default is False.
+        max_workers (int, optional): Maximum number of threads used to project large datasets (see Transformer.transform_parallel). Default is None (number of CPUs).
 
     Returns:
-        dict or None: A new dictionary with the projected coordinates or None if in_place is True.
+        dict or None: A new dictionary with the projected coordinates or None if in_place is True or if the fields are not found in data_dict.
 
     Raises:
         AssertionError: If epsg_from is equal to epsg_to, if fields has a length other than 3, or if any element in fields is not a string.
     """
+    if in_place:
+        out = data_dict
+    else:
+        out = copy_data_dict(data_dict)
+
+    if not project_fields_to_utm(
+        epsg_from=epsg_from,
+        epsg_to=epsg_to,
+        data_dict=out,
+        fields=[fields],
+        suffixes=[suffix],
+        max_workers=max_workers,
+    ):
+        return None
+
+    if in_place:
+        return None
+    else:
+        return out
+
+
+def project_fields_to_utm(
+    epsg_from: int,
+    epsg_to: int,
+    data_dict: dict,
+    fields: List[List[str]],
+    suffixes: List[str],
+    max_workers: int = None,
+) -> bool:
+    """
+    Converts several groups of geographic coordinates of the same rows (e.g., the EXIF and the MRK coordinates) to projected UTM coordinates in-place, with a single call to the pyproj transformer.
+
+    Args:
+        epsg_from (int): EPSG code of the initial coordinate reference system (pyproj.CRS).
+        epsg_to (int): EPSG code of the destination pyproj.CRS.
+        data_dict (dict): Dictionary containing the data to be projected. It is modified in-place.
+        fields (List[List[str]]): List of groups of two or three fields with the latitude, longitude (and height) of each set of coordinates (e.g., [["lat_exif", "lon_exif"], ["lat_mrk", "lon_mrk"]]).
+        suffixes (List[str]): Suffix to be appended to the new fields of each group of coordinates.
+        max_workers (int, optional): Maximum number of threads used to project large datasets (see Transformer.transform_parallel). Default is None (number of CPUs).
+
+    Returns:
+        bool: True if the coordinates were projected, False otherwise.
+
+    Raises:
+        AssertionError: If epsg_from is equal to epsg_to, if fields and suffixes have different lengths, if a group of fields has a length other than 2 or 3, or if any field is not a string.
+    """
     assert epsg_from != epsg_to, "EPSG codes must be different"
-    assert len(fields) in [
-        2,
-        3,
-    ], "Two or Three fields must be specified (e.g., ['lat', 'lon'] or ['lat', 'lon', 'h'])"
-    assert all(isinstance(i, str) for i in fields), "Fields must be strings"
+    assert len(fields) == len(
+        suffixes
+    ), "A suffix must be specified for each group of fields"
+    for group in fields:
+        assert len(group) in [
+            2,
+            3,
+        ], "Two or Three fields must be specified (e.g., ['lat', 'lon'] or ['lat', 'lon', 'h'])"
+        assert all(isinstance(i, str) for i in group), "Fields must be strings"
 
-    if len(fields) == 3:
+    if any(len(group) == 3 for group in fields):
         logger.info(
             "Height transformation not implemented yet. Hellispoidical height will be used."
         )
 
-    try:
-        transformer = Transformer(epsg_from=epsg_from, epsg_to=epsg_to)
-        assert (
-            transformer.crs_from.is_geographic
-        ), "Initial pyproj.CRS must be geographic."
-        assert (
-            transformer.crs_to.is_projected
-        ), "Destination pyproj.CRS to must be projected."
+    # Check once if all fields are present in data_dict (all the rows share the same fields)
+    sample = next((row for row in data_dict.values() if row is not None), None)
+    if sample is None:
+        logger.warning("Coordinate transformation failed. All input data are None.")
+        return False
+    missing = [f for group in fields for f in group if f not in sample]
+    if missing:
+        logger.warning(
+            f"Coordinate transformation failed. Fields {missing} not found in data_dict."
+        )
+        return False
 
-    except Exception as e:
-        logger.exception(
-            f"Unable to convert coordinate from EPSG:{epsg_from} to EPSG:{epsg_to}: {e}"
+    transformer = _get_projection_transformer(epsg_from, epsg_to)
+    if transformer is None:
+        return False
+
+    # Collect the coordinates of all the groups of all the valid rows and
+    # project them at once
+    rows = [row for row in data_dict.values() if row is not None]
+    missing = [key for key, row in data_dict.items() if row is None]
+    if missing:
+        logger.warning(
+            f"Coordinate transformation skipped for {len(missing)} images not found (input data is None): {missing}"
         )
-        return None
+    n = len(rows)
+    lat = np.fromiter(
+        (row[group[0]] for group in fields for row in rows), np.float64, n * len(fields)
+    )
+    lon = np.fromiter(
+        (row[group[1]] for group in fields for row in rows), np.float64, n * len(fields)
+    )
+    x, y = transformer.transform_parallel(lat, lon, max_workers=max_workers)
+
+    for i, (group, suffix) in enumerate(zip(fields, suffixes)):
+        xs = x[i * n : (i + 1) * n].tolist()
+        ys = y[i * n : (i + 1) * n].tolist()
+        for row, xi, yi in zip(rows, xs, ys):
+            row[f"E{suffix}"] = xi
+            row[f"N{suffix}"] = yi
+            if len(group) == 3:
+                row[f"h{suffix}"] = row[group[2]]
 
-    if not in_place:
-        out = deepcopy(data_dict)
+    return True
 
-    for key, row in data_dict.items():
-        # Check if image is present in data_dict
-        if row is None:
-            logger.warning(
-                f"Coordinate transformation failed for Image {key} not found. Input data is None."
-            )
-            continue
 
-        # Check if all fields are present in data_dict
-        for f in fields:
-            if f not in row.keys():
-                logger.warning(
-                    f"Coordinate transformation failed for Image {key} not found. Field {f} not found in data_dict at row {key}"
-                )
-                continue
+def project_columns_to_utm(
+    epsg_from: int,
+    epsg_to: int,
+    columns: dict,
+    fields: List[str] = ["lat", "lon"],
+    suffix: str = "",
+    max_workers: int = None,
+) -> bool:
+    """
+    Converts geographic coordinates stored as arrays (e.g., as returned by mrkread_columns) to projected UTM coordinates in-place, with a single call to the pyproj transformer.
 
-        lat = row[fields[0]]
-        lon = row[fields[1]]
-        x, y = transformer.transform(lat, lon)
+    Args:
+        epsg_from (int): EPSG code of the initial coordinate reference system (pyproj.CRS).
+        epsg_to (int): EPSG code of the destination pyproj.CRS.
+        columns (dict): Dictionary of arrays containing the data to be projected. The arrays of the projected coordinates are added to it.
+        fields (List[str], optional): Names of the latitude and longitude arrays, respectively. Default is ["lat", "lon"].
+        suffix (str): Suffix to be appended to the new fields. Default is "".
+        max_workers (int, optional): Maximum number of threads used to project large datasets (see Transformer.transform_parallel). Default is None (number of CPUs).
 
-        if in_place:
-            row[f"E{suffix}"] = x
-            row[f"N{suffix}"] = y
-            if len(fields) == 3:
-                row[f"h{suffix}"] = deepcopy(row[fields[2]])
-        else:
-            out[key][f"E{suffix}"] = x
-            out[key][f"N{suffix}"] = y
-            if len(fields) == 3:
-                row[f"h{suffix}"] = deepcopy(row[fields[2]])
+    Returns:
+        bool: True if the coordinates were projected, False otherwise.
 
-    if in_place:
+    Raises:
+        AssertionError: If epsg_from is equal to epsg_to, if fields has a length other than 2, or if any element in fields is not a string.
+    """
+    assert epsg_from != epsg_to, "EPSG codes must be different"
+    assert len(fields) == 2, "Two fields must be specified (e.g., ['lat', 'lon'])"
+    assert all(isinstance(i, str) for i in fields), "Fields must be strings"
+
+    missing = [f for f in fields if f not in columns]
+    if missing:
+        logger.warning(
+            f"Coordinate transformation failed. Fields {missing} not found in columns."
+        )
+        return False
+
+    transformer = _get_projection_transformer(epsg_from, epsg_to)
+    if transformer is None:
+        return False
+
+    columns[f"E{suffix}"], columns[f"N{suffix}"] = transformer.transform_parallel(
+        columns[fields[0]], columns[fields[1]], max_workers=max_workers
+    )
+
+    return True
+
+
+def _get_projection_transformer(epsg_from: int, epsg_to: int) -> Transformer:
+    """Returns the cached Transformer from a geographic to a projected CRS, or None (logging the error) if it cannot be built or the CRS are not geographic and projected, respectively."""
+    try:
+        transformer = get_transformer(epsg_from, epsg_to)
+        # WGS84 -> WGS84/UTM is known to be geographic -> projected: skip the
+        # CRS probes to the PROJ database
+        if not (epsg_from == EPSG_WGS84 and epsg_to in EPSG_WGS84_UTM):
+            assert (
+                transformer.crs_from.is_geographic
+            ), "Initial pyproj.CRS must be geographic."
+            assert (
+                transformer.crs_to.is_projected
+            ), "Destination pyproj.CRS to must be projected."
+
+    except Exception as e:
+        logger.exception(
+            f"Unable to convert coordinate from EPSG:{epsg_from} to EPSG:{epsg_to}: {e}"
+        )
         return None
-    else:
-        return out
+
+    return transformer
 
 
+@lru_cache(maxsize=None)
 def get_epsg_from_utm_zone(utm_zone: str) -> int:
+    """Returns the EPSG code of the WGS84 / UTM CRS of the given UTM zone (e.g., "32N" -> 32632)."""
     utm_emisph = utm_zone[-1]
     utm_zone = int(utm_zone[:-1])
     utm_base = 32600 if utm_emisph == "N" else 32700
@@ -340,73 +871,55 @@ def dji2csv(
 
     """
 
-    # Make deepcopy of data_dict to NOT modify input data
-    data4csv = deepcopy(data_dict)
-
-    # Use either coordinates from image EXIF metadata or from .mrk file
-    for k, v in data4csv.items():
-        if v is None:
-            logger.warning(f"Skipping image {k}: image not present in data folder.")
-            continue
-        if flag_useImageCoord == False:
-            v["lat"] = v["lat_mrk"]
-            v["lon"] = v["lon_mrk"]
-            v["ellh"] = v["ellh_mrk"]
-        else:
-            v["lat"] = v["lat_exif"]
-            v["lon"] = v["lon_exif"]
-            v["ellh"] = v["ellh_exif"]
-
-    # Apply UTM projection to coordinates
-    if flag_utm:
-        epsg_WGS84 = 4326
-        epsg_UTM = get_epsg_from_utm_zone(utm_zone)
-        project_to_utm(
-            epsg_from=epsg_WGS84,
-            epsg_to=epsg_UTM,
-            data_dict=data4csv,
-            fields=["lat", "lon", "ellh"],
-            in_place=True,
+    missing = [k for k, v in data_dict.items() if v is None]
+    if missing:
+        logger.warning(
+            f"Skipping {len(missing)} images not present in data folder: {missing}"
         )
 
-    # Apply scaling factors to standard deviations obtained from .mrk file
-    # for k, v in data4csv.items():
-    #     if v is None:
-    #         continue
-    #     if v["Qual_mrk"] == flag_qual[0]:
-    #         v["stdE"] = scale_factors[0] * v["stdE_mrk"]
-    #         v["stdN"] = scale_factors[0] * v["stdN_mrk"]
-    #         v["stdV"] = scale_factors[0] * v["stdV_mrk"]
-    #     elif v["Qual_mrk"] == flag_qual[1]:
-    #         v["stdE"] = scale_factors[1] * v["stdE_mrk"]
-    #         v["stdN"] = scale_factors[1] * v["stdN_mrk"]
-    #         v["stdV"] = scale_factors[1] * v["stdV_mrk"]
-    #     elif v["Qual_mrk"] == flag_qual[2]:
-    #         v["stdE"] = scale_factors[2] * v["stdE_mrk"]
-    #         v["stdN"] = scale_factors[2] * v["stdN_mrk"]
-    #         v["stdV"] = scale_factors[2] * v["stdV_mrk"]
-    #     else:
-    #         logger.warning(f"Skipping image {k}: invalid quality flag.")
-
+    # Apply scaling factors to standard deviations obtained from .mrk file,
+    # skipping the images with a quality flag not in flag_qual
     scale_factors_map = {
         flag_qual[0]: scale_factors[0],
         flag_qual[1]: scale_factors[1],
         flag_qual[2]: scale_factors[2],
     }
-
-    for k, v in data4csv.items():
+    rows = []
+    for k, v in data_dict.items():
         if v is None:
             continue
-        qual_mrk = v["Qual_mrk"]
-        if qual_mrk in scale_factors_map:
-            scale_factor = scale_factors_map[qual_mrk]
-            v["stdE"] = scale_factor * v["stdE_mrk"]
-            v["stdN"] = scale_factor * v["stdN_mrk"]
-            v["stdV"] = scale_factor * v["stdV_mrk"]
+        if v["Qual_mrk"] in scale_factors_map:
+            rows.append(v)
         else:
             logger.warning(f"Skipping image {k}: invalid quality flag.")
 
-    # define header for csv file
+    # Gather the fields of all the rows as arrays (columns) and process them
+    # at once, instead of row by row
+    n = len(rows)
+
+    def column(field: str) -> np.ndarray:
+        return np.fromiter((v[field] for v in rows), np.float64, n)
+
+    # Use either coordinates from image EXIF metadata or from .mrk file
+    source = "exif" if flag_useImageCoord else "mrk"
+    data4csv = {
+        "lat": column(f"lat_{source}"),
+        "lon": column(f"lon_{source}"),
+        "ellh": column(f"ellh_{source}"),
+    }
+
+    # Apply UTM projection to coordinates
+    if flag_utm and n:
+        epsg_UTM = get_epsg_from_utm_zone(utm_zone)
+        if not project_columns_to_utm(EPSG_WGS84, epsg_UTM, data4csv):
+            return False
+        data4csv["h"] = data4csv["ellh"]
+
+    scale = np.fromiter((scale_factors_map[v["Qual_mrk"]] for v in rows), np.float64, n)
+    for std in ["stdE", "stdN", "stdV"]:
+        data4csv[std] = scale * column(f"{std}_mrk")
+
+    # define header, columns and row format of the csv file
     header = [
         "ID",
         "Image Name",
@@ -417,6 +930,10 @@ def dji2csv(
         "Lat [deg]",
         "h [m]",
     ]
+    columns = [[v[f] for v in rows] for f in ["id", "basename_exif", "path_exif"]]
+    columns += [[v[f] for v in rows] for f in ["date_exif", "time_exif"]]
+    columns += [data4csv[f].tolist() for f in ["lon", "lat", "ellh"]]
+    fmt = ["{}"] * 5 + ["{:0.8f}", "{:0.8f}", "{:0.3f}"]
     if flag_utm:
         header.extend(
             [
@@ -425,47 +942,31 @@ def dji2csv(
                 f"h UTM{utm_zone} [m]",
             ]
         )
+        columns += [data4csv[f].tolist() for f in ["E", "N", "h"]] if n else []
+        fmt += ["{:.3f}"] * 3
     header.extend(["stdE [m]", "stdN [m]", "stdV [m]"])
+    columns += [data4csv[f].tolist() for f in ["stdE", "stdN", "stdV"]]
+    fmt += ["{:.4f}"] * 3
+    row_fmt = ",".join(fmt) + "\n"
 
     # write csv file
     with open(foutname, "w") as fout:
         fout.write(",".join(header) + "\n")
-        for k, v in data4csv.items():
-            if v is None:
-                continue
-            ln = [
-                v["id"],
-                Path(v["path_exif"]).name,
-                v["path_exif"],
-                v["date_exif"],
-                v["time_exif"],
-                f"{v['lon']:0.8f}",
-                f"{v['lat']:0.8f}",
-                f"{v['ellh']:0.3f}",
-            ]
-            if flag_utm:
-                ln.extend(
-                    [
-                        f"{v['E']:.3f}",
-                        f"{v['N']:.3f}",
-                        f"{v['h']:.3f}",
-                    ]
-                )
-            ln.extend(
-                [
-                    f"{v['stdE']:.4f}",
-                    f"{v['stdN']:.4f}",
-                    f"{v['stdV']:.4f}",
-                ]
-            )
-            ln = [str(x) for x in ln]
-            fout.write(",".join(ln) + "\n")
+        fout.writelines(row_fmt.format(*ln) for ln in zip(*columns))
 
     logger.info(f"CSV file {foutname} written successfully.")
 
     return True
 
 
+def _xlsx_width(value, num_fmt: str = None) -> int:
+    """Returns the number of characters of a cell value as displayed in Excel with the given number format (e.g., "0.000"). Strings (or values without a number format) are measured as they are."""
+    if num_fmt is None or isinstance(value, str):
+        return len(str(value))
+    decimals = len(num_fmt.partition(".")[2])
+    return len(f"{value:.{decimals}f}")
+
+
 def dji2xlsx(
     data_dict: dict,
     foutname: str,
@@ -489,509 +990,281 @@ def dji2xlsx(
         bool: True if the file is created successfully, False otherwise.
 
     """
-    # Make deepcopy of data_dict to NOT modify input data
-    data_dict = deepcopy(data_dict)
+    # Make a copy of data_dict to NOT modify input data
+    data_dict = copy_data_dict(data_dict)
 
     # Create an new Excel file and add a worksheet.
-    xbook = xlsxwriter.Workbook(foutname, {"nan_inf_to_errors": True})
+    # constant_memory mode flushes each row to disk once the next one is started,
+    # so all the rows of a sheet must be written in increasing order
+    xbook = xlsxwriter.Workbook(
+        foutname, {"nan_inf_to_errors": True, "constant_memory": True}
+    )
+
+    # Cell formats (created once and shared by all the cells)
+    fmt_bold = xbook.add_format({"bold": True})
+    fmt_datetime = xbook.add_format({"num_format": "yyyy/mm/dd hh:mm:ss"})
+    fmt_int = xbook.add_format({"num_format": "0"})
+    fmt_3dec = xbook.add_format({"num_format": "0.000"})
+    fmt_6dec = xbook.add_format({"num_format": "0.000000"})
+    fmt_8dec = xbook.add_format({"num_format": "0.00000000"})
+    num_fmts = {
+        "0": fmt_int,
+        "0.000": fmt_3dec,
+        "0.000000": fmt_6dec,
+        "0.00000000": fmt_8dec,
+    }
 
-    # Write camera data -----------------------------------------------------------
-    exif_xsheet = xbook.add_worksheet("EXIF")
-    h_exif = [
-        "ID",
-        "Image Name",
-        "Image Path",
-        "Date-Time",
-        "Lon [deg]",
-        "Lat [deg]",
-        "h [m]",
+    # Numeric columns of the EXIF and LOG sheets, with their cell format
+    exif_cols = XLSX_EXIF_COLUMNS
+    log_cols = XLSX_LOG_COLUMNS
+    if flag_utm == 1:
+        exif_cols = exif_cols + XLSX_EXIF_UTM_COLUMNS
+        log_cols = log_cols + XLSX_LOG_UTM_COLUMNS
+    log_cols = log_cols + XLSX_LOG_QUALITY_COLUMNS
+    exif_cols = [
+        (header.format(zone=utm_zone), field, num_fmts[num_fmt], scale, num_fmt)
+        for header, field, num_fmt, scale in exif_cols
     ]
+    log_cols = [
+        (header.format(zone=utm_zone), field, num_fmts[num_fmt], scale, num_fmt)
+        for header, field, num_fmt, scale in log_cols
+    ]
+
     if flag_utm == 1:
-        epsg_WGS84 = 4326
-        epsg_UTM = get_epsg_from_utm_zone(utm_zone)
-        project_to_utm(
-            epsg_from=epsg_WGS84,
-            epsg_to=epsg_UTM,
+        # Project both the EXIF and the MRK coordinates with a single transformation
+        project_fields_to_utm(
+            epsg_from=EPSG_WGS84,
+            epsg_to=get_epsg_from_utm_zone(utm_zone),
             data_dict=data_dict,
-            fields=["lat_exif", "lon_exif", "ellh_exif"],
-            suffix="_exif",
-            in_place=True,
-        )
-        h_exif.extend(
-            [
-                f"East UTM{utm_zone} [m]",
-                f"North UTM{utm_zone} [m]",
-                f"h UTM{utm_zone} [m]",
-            ]
+            fields=[
+                ["lat_exif", "lon_exif", "ellh_exif"],
+                ["lat_mrk", "lon_mrk", "ellh_mrk"],
+            ],
+            suffixes=["_exif", "_mrk"],
         )
 
-    # header
-    for i in range(len(h_exif)):
-        exif_xsheet.write(0, i, h_exif[i], xbook.add_format({"bold": True}))
-
-    r = 0
-    for key, row in data_dict.items():
-        if row is None:
-            logger.warning(f"Skipping image {key}: image not present in data folder.")
-            r = r + 1
-            continue
+    # Camera data sheet header
+    exif_xsheet = xbook.add_worksheet("EXIF")
+    h_exif = ["ID", "Image Name", "Image Path", "Date-Time"]
+    h_exif.extend(col[0] for col in exif_cols)
+    exif_xsheet.write_row(0, 0, h_exif, fmt_bold)
 
-        r = r + 1
-        # image ID
-        c = 0
-        exif_xsheet.write(r, c, key)
-        # image name
-        c = c + 1
-        exif_xsheet.write(r, c, row["name_exif"])
-        # image path
-        c = c + 1
-        exif_xsheet.write(r, c, row["path_exif"])
-        # date-time
-        c = c + 1
-        date_time = datetime.strptime(
-            row["date_exif"].replace(":", "/") + " " + row["time_exif"],
-            "%Y/%m/%d %H:%M:%S",
-        )
-        exif_xsheet.write(
-            r, c, date_time, xbook.add_format({"num_format": "yyyy/mm/dd hh:mm:ss"})
-        )
-        # Longitude
-        c = c + 1
-        if not (np.isnan(row["lon_exif"])):
-            exif_xsheet.write(
-                r,
-                c,
-                row["lon_exif"],
-                xbook.add_format({"num_format": "0." + "0" * 8}),
-            )
-        # Latitude
-        c = c + 1
-        if not (np.isnan(row["lat_exif"])):
-            exif_xsheet.write(
-                r,
-                c,
-                row["lat_exif"],
-                xbook.add_format({"num_format": "0." + "0" * 8}),
-            )
-        # Ellipsoidal height
-        c = c + 1
-        if not (np.isnan(row["ellh_exif"])):
-            exif_xsheet.write(
-                r,
-                c,
-                row["ellh_exif"],
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        if flag_utm == 1:
-            # East
-            c = c + 1
-            if not (np.isnan(row["E_exif"])):
-                exif_xsheet.write(
-                    r,
-                    c,
-                    row["E_exif"],
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-            # North
-            c = c + 1
-            if not (np.isnan(row["N_exif"])):
-                exif_xsheet.write(
-                    r,
-                    c,
-                    row["N_exif"],
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-            # height
-            c = c + 1
-            if not (np.isnan(row["h_exif"])):
-                exif_xsheet.write(
-                    r,
-                    c,
-                    row["h_exif"],
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
+    # Column widths are tracked while writing, as autofit() does not work in
+    # constant_memory mode
+    exif_widths = [len(h) for h in h_exif]
 
-    # Write log data --------------------------------------------------------------
+    # Log data sheet header
     log_xsheet = xbook.add_worksheet("LOG")
-    if flag_utm == 1:
-        project_to_utm(
-            epsg_from=epsg_WGS84,
-            epsg_to=epsg_UTM,
-            data_dict=data_dict,
-            fields=["lat_mrk", "lon_mrk", "ellh_mrk"],
-            suffix="_mrk",
-            in_place=True,
-        )
+    h_log = ["ID", "Clock time [s]"]
+    h_log.extend(col[0] for col in log_cols)
+    h_log.append("Flag")
+    log_xsheet.write_row(0, 0, h_log, fmt_bold)
+    log_widths = [len(h) for h in h_log]
 
-        h_log = [
-            "ID",
-            "Clock time [s]",
-            "Lon [deg]",
-            "Lat [deg]",
+    # Output sheets headers
+    coord_ref_sheets = ["LOG", "EXIF"]
+    # Columns of the LOG sheet with the quality flag and the standard deviations
+    if flag_utm == 1:
+        qual_col, std_cols = "O", ["I", "J", "K"]
+    else:
+        qual_col, std_cols = "L", ["F", "G", "H"]
+    # Table with the scale factors of the standard deviations, written next to
+    # the first rows of the data
+    scale_table = [
+        ("FIXED", flag_qual[0], scale_factors[0]),
+        ("FLOAT", flag_qual[1], scale_factors[1]),
+        ("AUTONOMOUS", flag_qual[2], scale_factors[2]),
+    ]
+    if flag_utm == 1:
+        h_output = [
+            "Image name",
+            "East [m]",
+            "North [m]",
             "h [m]",
-            f"East UTM{utm_zone} [m]",
-            f"North UTM{utm_zone} [m]",
-            f"h UTM{utm_zone} [m]",
             "ESDV [m]",
             "NSDV [m]",
             "VSDV [m]",
-            "dE [m]",
-            "dN [m]",
-            "dV [m]",
-            "Quality",
-            "Flag",
         ]
+        # Number formats of the coordinates in the OUTPUT sheets
+        coords_fmts = ["0.000", "0.000", "0.000"]
     else:
-        h_log = [
-            "ID",
-            "Clock time [s]",
+        h_output = [
+            "Image Name",
             "Lon [deg]",
             "Lat [deg]",
             "h [m]",
             "ESDV [m]",
             "NSDV [m]",
             "VSDV [m]",
-            "dE [m]",
-            "dN [m]",
-            "dV [m]",
-            "Quality",
-            "Flag",
         ]
-    # header
-    for i in range(len(h_log)):
-        log_xsheet.write(0, i, h_log[i], xbook.add_format({"bold": True}))
-
-    r = 0
-    for key, row in data_dict.items():
-        if row is None:
-            r = r + 1
-            continue
-
-        r = r + 1
-        # image ID
-        c = 0
-        log_xsheet.write(r, c, key)
-        # time
-        c = c + 1
-        log_xsheet.write(
-            r,
-            c,
-            row["clock_time_mrk"],
-            xbook.add_format({"num_format": "0." + "0" * 6}),
+        coords_fmts = ["0.00000000", "0.00000000", "0.000"]
+    output_num_fmts = [None, *coords_fmts, "0.000", "0.000", "0.000"]
+    output_xsheets = {}
+    output_widths = {}
+    # Formula templates (with their cell format) of the columns of the OUTPUT
+    # sheets, built once and filled with the row number {rn} of each row.
+    # Coordinates are taken from the reference sheet, the standard deviations
+    # are always taken from the LOG sheet and scaled by the factor table.
+    output_formulas = {}
+    std_formulas = [
+        (
+            f"=IF(LOG!{qual_col}{{rn}}<=$J$4,LOG!{col}{{rn}}*$K$4,"
+            f"IF(LOG!{qual_col}{{rn}}<=$J$3,LOG!{col}{{rn}}*$K$3,"
+            f"IF(LOG!{qual_col}{{rn}}<=$J$2,LOG!{col}{{rn}}*$K$2,"
+            f"LOG!{col}{{rn}})))",
+            fmt_3dec,
         )
-        # Longitude
-        c = c + 1
-        if not (np.isnan(row["lon_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["lon_mrk"],
-                xbook.add_format({"num_format": "0." + "0" * 8}),
-            )
-        # Latitude
-        c = c + 1
-        if not (np.isnan(row["lat_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["lat_mrk"],
-                xbook.add_format({"num_format": "0." + "0" * 8}),
-            )
-        # Ellipsoidal height
-        c = c + 1
-        if not (np.isnan(row["ellh_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["ellh_mrk"],
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        if flag_utm == 1:
-            # Longitude
-            c = c + 1
-            if not (np.isnan(row["E_mrk"])):
-                log_xsheet.write(
-                    r,
-                    c,
-                    row["E_mrk"],
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-            # Latitude
-            c = c + 1
-            if not (np.isnan(row["N_mrk"])):
-                log_xsheet.write(
-                    r,
-                    c,
-                    row["N_mrk"],
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-            # Ellipsoidal height
-            c = c + 1
-            if not (np.isnan(row["h_mrk"])):
-                log_xsheet.write(
-                    r,
-                    c,
-                    row["h_mrk"],
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-        # ESDV
-        c = c + 1
-        if not (np.isnan(row["stdE_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["stdE_mrk"],
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        # NSDV
-        c = c + 1
-        if not (np.isnan(row["stdN_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["stdN_mrk"],
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        # VSDV
-        c = c + 1
-        if not (np.isnan(row["stdV_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["stdV_mrk"],
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        # dE
-        c = c + 1
-        if not (np.isnan(row["dE_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["dE_mrk"] / 1000,
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        # dN
-        c = c + 1
-        if not (np.isnan(row["dN_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["dN_mrk"] / 1000,
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        # dH
-        c = c + 1
-        if not (np.isnan(row["dV_mrk"])):
-            log_xsheet.write(
-                r,
-                c,
-                row["dV_mrk"] / 1000,
-                xbook.add_format({"num_format": "0." + "0" * 3}),
-            )
-        # Qual
-        c = c + 1
-        if not (np.isnan(row["Qual_mrk"])):
-            log_xsheet.write(
-                r, c, row["Qual_mrk"], xbook.add_format({"num_format": "0"})
-            )
-        # Flag
-        c = c + 1
-        log_xsheet.write(r, c, row["Flag_mrk"])
-
-    # Output data
-    # --------------------------------------------------------------
-    coord_ref_sheets = ["LOG", "EXIF"]
+        for col in std_cols
+    ]
     for coord_ref_sheet in coord_ref_sheets:
         output_xsheet = xbook.add_worksheet("OUTPUT_" + coord_ref_sheet)
-        if flag_utm == 1:
-            h_output = [
-                "Image name",
-                "East [m]",
-                "North [m]",
-                "h [m]",
-                "ESDV [m]",
-                "NSDV [m]",
-                "VSDV [m]",
-            ]
+        # header (including the one of the scale factor table)
+        output_xsheet.write_row(0, 0, h_output, fmt_bold)
+        output_xsheet.write(0, len(h_output) + 2, "FLAG", fmt_bold)
+        output_xsheet.write(0, len(h_output) + 3, "FACTOR", fmt_bold)
+        output_xsheets[coord_ref_sheet] = output_xsheet
+        if coord_ref_sheet == "LOG":
+            coords_cols = ["F", "G", "H"] if flag_utm == 1 else ["C", "D", "E"]
         else:
-            h_output = [
-                "Image Name",
-                "Lon [deg]",
-                "Lat [deg]",
-                "h [m]",
-                "ESDV [m]",
-                "NSDV [m]",
-                "VSDV [m]",
-            ]
-
-        # header
-        for i in range(len(h_output)):
-            output_xsheet.write(0, i, h_output[i], xbook.add_format({"bold": True}))
-
-        # table with scale factors
-        output_xsheet.write(
-            1, len(h_output) + 1, "FIXED", xbook.add_format({"bold": True})
-        )
-        output_xsheet.write(
-            2, len(h_output) + 1, "FLOAT", xbook.add_format({"bold": True})
-        )
-        output_xsheet.write(
-            3, len(h_output) + 1, "AUTONOMOUS", xbook.add_format({"bold": True})
-        )
-
-        output_xsheet.write(
-            0, len(h_output) + 2, "FLAG", xbook.add_format({"bold": True})
-        )
-        output_xsheet.write(
-            0, len(h_output) + 3, "FACTOR", xbook.add_format({"bold": True})
-        )
+            coords_cols = ["H", "I", "J"] if flag_utm == 1 else ["E", "F", "G"]
+        output_formulas[coord_ref_sheet] = [
+            ('=CONCATENATE(EXIF!B{rn}, ".jpg")', None),
+            *[
+                (f"={coord_ref_sheet}!{col}{{rn}}", num_fmts[num_fmt])
+                for col, num_fmt in zip(coords_cols, coords_fmts)
+            ],
+            *std_formulas,
+        ]
+        output_widths[coord_ref_sheet] = [len(h) for h in h_output] + [
+            0,
+            0,
+            len("FLAG"),
+            len("FACTOR"),
+        ]
 
-        output_xsheet.write(
-            1, len(h_output) + 2, flag_qual[0], xbook.add_format({"num_format": "0"})
-        )
-        output_xsheet.write(
-            2, len(h_output) + 2, flag_qual[1], xbook.add_format({"num_format": "0"})
-        )
-        output_xsheet.write(
-            3, len(h_output) + 2, flag_qual[2], xbook.add_format({"num_format": "0"})
+    # Write the data of all the sheets with a single pass over data_dict. Rows
+    # are written in increasing order, as required in constant_memory mode
+    # (each sheet has its own row buffer, so the sheets can be written together)
+    rows = list(data_dict.items())
+    missing = [key for key, row in rows if row is None]
+    if missing:
+        logger.warning(
+            f"Skipping {len(missing)} images not present in data folder: {missing}"
         )
+    for r in range(1, max(len(rows), len(scale_table)) + 1):
+        # table with scale factors
+        if r <= len(scale_table):
+            label, flag, factor = scale_table[r - 1]
+            c = len(h_output) + 1
+            for coord_ref_sheet, output_xsheet in output_xsheets.items():
+                widths = output_widths[coord_ref_sheet]
+                output_xsheet.write_string(r, c, label, fmt_bold)
+                output_xsheet.write_number(r, c + 1, flag, fmt_int)
+                output_xsheet.write_number(r, c + 2, factor, fmt_3dec)
+                for i, (value, num_fmt) in enumerate(
+                    [(label, None), (flag, "0"), (factor, "0.000")]
+                ):
+                    widths[c + i] = max(widths[c + i], _xlsx_width(value, num_fmt))
+
+        if r > len(rows):
+            continue
+        key, row = rows[r - 1]
+        if row is None:
+            continue
 
-        output_xsheet.write(
-            1,
-            len(h_output) + 3,
-            scale_factors[0],
-            xbook.add_format({"num_format": "0." + "0" * 3}),
+        # Camera data ---------------------------------------------------------------
+        # image ID, name and path
+        exif_xsheet.write_number(r, 0, key)
+        exif_xsheet.write_string(r, 1, row["name_exif"])
+        exif_xsheet.write_string(r, 2, row["path_exif"])
+        # date-time (EXIF date and time have a fixed "YYYY:MM:DD" "HH:MM:SS"
+        # format, so they are sliced directly instead of parsed with strptime)
+        d, t = row["date_exif"], row["time_exif"]
+        date_time = datetime(
+            int(d[0:4]),
+            int(d[5:7]),
+            int(d[8:10]),
+            int(t[0:2]),
+            int(t[3:5]),
+            int(t[6:8]),
         )
-        output_xsheet.write(
-            2,
-            len(h_output) + 3,
-            scale_factors[1],
-            xbook.add_format({"num_format": "0." + "0" * 3}),
-        )
-        output_xsheet.write(
-            3,
-            len(h_output) + 3,
-            scale_factors[2],
-            xbook.add_format({"num_format": "0." + "0" * 3}),
-        )
-
-        r = 0
-        for key in data_dict.keys():
-            if data_dict[key] is None:
-                logger.warning(
-                    f"Skipping image {key}: image not present in data folder."
+        exif_xsheet.write_datetime(r, 3, date_time, fmt_datetime)
+        for c, value in enumerate([key, row["name_exif"], row["path_exif"]]):
+            exif_widths[c] = max(exif_widths[c], _xlsx_width(value, "0"))
+        exif_widths[3] = max(exif_widths[3], len("yyyy/mm/dd hh:mm:ss"))
+        # Lon, Lat, h (and East, North, h UTM)
+        for c, (_, field, fmt, scale, num_fmt) in enumerate(exif_cols, start=4):
+            value = row[field]
+            if not (isnan(value)):
+                exif_xsheet.write_number(r, c, value / scale, fmt)
+                exif_widths[c] = max(
+                    exif_widths[c], _xlsx_width(value / scale, num_fmt)
                 )
-                r = r + 1
-                continue
-
-            r = r + 1
 
-            # image name
-            c = 0
-            output_xsheet.write_formula(
-                r, c, '=CONCATENATE(EXIF!B%d, ".jpg")' % (r + 1)
-            )
-            if coord_ref_sheet == "LOG":
-                llh_cols = ["C", "D", "E"]
-                enh_cols = ["F", "G", "H"]
-            else:
-                llh_cols = ["E", "F", "G"]
-                enh_cols = ["H", "I", "J"]
+        # Log data ------------------------------------------------------------------
+        # image ID and clock time
+        log_xsheet.write_number(r, 0, key)
+        log_xsheet.write_number(r, 1, row["clock_time_mrk"], fmt_6dec)
+        log_widths[0] = max(log_widths[0], _xlsx_width(key, "0"))
+        log_widths[1] = max(
+            log_widths[1], _xlsx_width(row["clock_time_mrk"], "0.000000")
+        )
+        # Lon, Lat, h, (East, North, h UTM), std, dE, dN, dV, Qual
+        for c, (_, field, fmt, scale, num_fmt) in enumerate(log_cols, start=2):
+            value = row[field]
+            if not (isnan(value)):
+                log_xsheet.write_number(r, c, value / scale, fmt)
+                log_widths[c] = max(log_widths[c], _xlsx_width(value / scale, num_fmt))
+        # Flag
+        c = len(log_cols) + 2
+        log_xsheet.write_string(r, c, row["Flag_mrk"])
+        log_widths[c] = max(log_widths[c], len(row["Flag_mrk"]))
+
+        # Output data ---------------------------------------------------------------
+        # Compute the values of the formulas in python, to store them as
+        # cached formula results in the workbook. The scaled standard
+        # deviations are the same for both the output sheets.
+        qual = row["Qual_mrk"]
+        if qual <= flag_qual[2]:
+            factor = scale_factors[2]
+        elif qual <= flag_qual[1]:
+            factor = scale_factors[1]
+        elif qual <= flag_qual[0]:
+            factor = scale_factors[0]
+        else:
+            factor = 1
+        stds = [row["stdE_mrk"], row["stdN_mrk"], row["stdV_mrk"]]
+        stds = [0 if isnan(x) else x * factor for x in stds]
 
+        for coord_ref_sheet, output_xsheet in output_xsheets.items():
+            widths = output_widths[coord_ref_sheet]
+            sfx = "_mrk" if coord_ref_sheet == "LOG" else "_exif"
             if flag_utm == 1:
-                # East
-                c = c + 1
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "=%s!%s%d" % (coord_ref_sheet, enh_cols[0], r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-                # North
-                c = c + 1
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "=%s!%s%d" % (coord_ref_sheet, enh_cols[1], r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-                # h
-                c = c + 1
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "=%s!%s%d" % (coord_ref_sheet, enh_cols[2], r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
+                coords = [row[f"E{sfx}"], row[f"N{sfx}"], row[f"h{sfx}"]]
             else:
-                # Lon
-                c = c + 1
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "=%s!%s%d" % (coord_ref_sheet, llh_cols[0], r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 8}),
-                )
-                # Lat
-                c = c + 1
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "=%s!%s%d" % (coord_ref_sheet, llh_cols[1], r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 8}),
-                )
-                # h
-                c = c + 1
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "=%s!%s%d" % (coord_ref_sheet, llh_cols[2], r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
-            # ESDV, NSDV, VSDV
-            cols = ["I", "J", "K"]  # columns with stds in LOG file
-            for col in cols:
-                c = c + 1
-                if_auton = "IF(LOG!O%d<=$J$4,%s!%s%d*$K$4," % (r + 1, "LOG", col, r + 1)
-                if_float = "IF(LOG!O%d<=$J$3,%s!%s%d*$K$3," % (r + 1, "LOG", col, r + 1)
-                if_fixed = "IF(LOG!O%d<=$J$2,%s!%s%d*$K$2," % (r + 1, "LOG", col, r + 1)
-                output_xsheet.write_formula(
-                    r,
-                    c,
-                    "="
-                    + if_auton
-                    + if_float
-                    + if_fixed
-                    + "%s!%s%d)))" % (coord_ref_sheet, col, r + 1),
-                    xbook.add_format({"num_format": "0." + "0" * 3}),
-                )
+                coords = [row[f"lon{sfx}"], row[f"lat{sfx}"], row[f"ellh{sfx}"]]
+            coords = [0 if isnan(x) else x for x in coords]
+            values = [row["name_exif"] + ".jpg", *coords, *stds]
+            for c, (value, num_fmt) in enumerate(zip(values, output_num_fmts)):
+                widths[c] = max(widths[c], _xlsx_width(value, num_fmt))
+
+            # Formulas (with their cached values)
+            for c, ((template, fmt), value) in enumerate(
+                zip(output_formulas[coord_ref_sheet], values)
+            ):
+                output_xsheet.write_formula(r, c, template.format(rn=r + 1), fmt, value)
+
+    # Resize the columns to fit their content
+    for xsheet, widths in zip(
+        xbook.worksheets(),
+        [exif_widths, log_widths, *output_widths.values()],
+    ):
+        for c, width in enumerate(widths):
+            if width:
+                xsheet.set_column(c, c, width + 2)
 
     xbook.close()
 
-    system = platform.system()
-    if system == "Windows":
-        try:
-            win32 = import_module("win32com.client")
-            excel = win32.Dispatch("Excel.Application")
-            excel.Visible = 0
-            wb = excel.Workbooks.Open(foutname)
-            ws = wb.Worksheets("EXIF")
-            ws.Columns.AutoFit()
-            ws = wb.Worksheets("LOG")
-            ws.Columns.AutoFit()
-            for coord_ref_sheet in coord_ref_sheets:
-                ws = wb.Worksheets("OUTPUT_" + coord_ref_sheet)
-                ws.Columns.AutoFit()
-            wb.Save()
-            wb.Close()
-            # excel.Application.Quit()
-        except:
-            logger.warning("Problem while resizing columns!")
-    else:
-        logger.warning(
-            f"dji2excel: unable to resize columns on {system} systems. Please resize columns manually."
-        )
-
     logger.info("Excel file created successfully.")
 
     return True
@@ -32,31 +32,37 @@ def organize_files(
 ) -> None:
     """Organizes files in a given directory into corresponding subdirectories based on file extension."""
 
-    files = os.listdir(dir)
-    current_extensions = set([get_extension(file) for file in files])
-
+    # Reverse lookup from extension to rule, to match each file in O(1). The
+    # extensions are compared in lower case, while the output directories are
+    # named after the rules as given (not lowercased).
+    ext_to_rule = {}
     for rule, extensions in rules.items():
         if not isinstance(extensions, list):
             raise TypeError("Rules must be a dictionary of lists.")
-        # Check if at least one of the extensions is in the current directory
-        if any([v in current_extensions for v in extensions]):
-            out_path = Path(dir) / rule.lower()
-            out_path.mkdir(exist_ok=True, parents=True)
-
-    for file in files:
-        ext = get_extension(file)
-        if not ext:
-            continue  # Skip directories and files without extensions
-
-        for rule, extensions in rules.items():
-            if ext in extensions:
-                if inplace:
-                    new_path = Path(dir) / rule / file
-                    os.rename(os.path.join(dir, file), new_path)
-                else:
-                    new_path = Path(dir) / rule / Path(file).name
-                    shutil.copy(os.path.join(dir, file), new_path)
-                break
+        for ext in extensions:
+            ext_to_rule.setdefault(ext.lower(), rule)
+
+    # Output directories (created lazily, on the first file that needs them)
+    out_dirs = {rule: os.path.join(dir, rule) for rule in rules}
+    created = set()
+    with os.scandir(dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue  # Skip directories
+            ext = os.path.splitext(entry.name)[1][1:].lower()
+            rule = ext_to_rule.get(ext)
+            if rule is None:
+                continue  # Skip files without extensions or without a rule
+
+            if rule not in created:
+                os.makedirs(out_dirs[rule], exist_ok=True)
+                created.add(rule)
+
+            # The output directories are inside dir, so files can be renamed
+            if inplace:
+                os.replace(entry.path, os.path.join(out_dirs[rule], entry.name))
+            else:
+                shutil.copy(entry.path, os.path.join(out_dirs[rule], entry.name))
 
 
 class Organizer:
@@ -0,0 +1,76 @@
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Tuple, Union
+
+# Maximum number of paths looked up with a single query
+QUERY_CHUNK_SIZE = 500
+
+
+class ExifCache:
+    """SQLite cache of the EXIF data of the images, keyed by image path and modification time, so that the images that did not change are not parsed again at each conversion."""
+
+    def __init__(self, db_path: Union[str, Path]) -> None:
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path (Union[str, Path]): Path to the SQLite database file.
+        """
+        self._con = sqlite3.connect(str(db_path))
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS exif (path TEXT PRIMARY KEY, mtime_ns INTEGER, exif_json TEXT)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._con.close()
+
+    def get(self, files: List[Path]) -> Tuple[dict, List[Path]]:
+        """Returns the cached EXIF data of the images that did not change since they were cached and the list of the images that must be read.
+
+        Args:
+            files (List[Path]): List of paths to the images.
+
+        Returns:
+            Tuple[dict, List[Path]]: The cached EXIF data (as a dictionary keyed by image id, as returned by dji.get_images) and the list of the files not found in the cache or modified since.
+        """
+        mtimes = {str(f): os.stat(f).st_mtime_ns for f in files}
+        paths = list(mtimes)
+        cached = {}
+        found = set()
+        for i in range(0, len(paths), QUERY_CHUNK_SIZE):
+            chunk = paths[i : i + QUERY_CHUNK_SIZE]
+            rows = self._con.execute(
+                f"SELECT path, mtime_ns, exif_json FROM exif WHERE path IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for path, mtime_ns, exif_json in rows:
+                if mtimes[path] == mtime_ns:
+                    data = json.loads(exif_json)
+                    cached[data["id"]] = data
+                    found.add(path)
+
+        return cached, [f for f in files if str(f) not in found]
+
+    def put(self, exif_dict: dict) -> None:
+        """Store the EXIF data of the images (as returned by dji.get_images) in the cache. Images whose EXIF data could not be read (None) are not stored.
+
+        Args:
+            exif_dict (dict): Dictionary with the EXIF data of the images.
+        """
+        rows = [
+            (data["path"], os.stat(data["path"]).st_mtime_ns, json.dumps(data))
+            for data in exif_dict.values()
+            if data is not None
+        ]
+        with self._con:
+            self._con.executemany("INSERT OR REPLACE INTO exif VALUES (?, ?, ?)", rows)
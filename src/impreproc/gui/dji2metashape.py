@@ -1,25 +1,31 @@
 import configparser
 import logging
 import os
+import re
+import sqlite3
 import sys
-from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
+from typing import List
 
-import guidata
 import guidata.dataset.dataitems as di
 import guidata.dataset.datatypes as dt
-import numpy as np
 from guidata.configtools import get_icon
 from guidata.dataset.qtwidgets import DataSetEditGroupBox, DataSetShowGroupBox
 from guidata.qthelpers import add_actions, create_action, get_std_icon
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QSplitter
-
-import impreproc.dji as dji
+from PyQt5.QtCore import QObject, Qt, QThread, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import (
+    QApplication,
+    QMainWindow,
+    QMessageBox,
+    QProgressBar,
+    QSplitter,
+)
+
+from impreproc.gui._exif_cache import ExifCache
 from impreproc.utils.logger import setup_logger
 
 """
-    TODO: catch the error type and show a different output message for each type of error (use less catch-all excepts but catch specific errors)
     TODO: make it possible to set all the parameters from a .ini file that is read at startup
     TODO: On linux, restricting the file types to be shown in the file dialog to .MRK and .mrk does not work. Now it is possible to select any file type. Fix this.
     TODO: cleanup the input paramters after the conversion is done and allow for another conversion.
@@ -33,12 +39,20 @@ LOG_LEVEL = logging.INFO
 setup_logger(LOG_LEVEL, log_to_file=False, base_log_name="dji2metashape")
 logger = logging.getLogger(__name__)
 
-_app = guidata.qapplication()  # not required if a QApplication has already been created
+# The QApplication is created by the entry point (see __main__ below and
+# main.py), not when this module is imported
 
 # read parameters from ini file
 # -----------------------------------------------
 iniFile = "dji2metashape.ini"
 
+# delay [ms] before the settings are written to the ini file, so that
+# repeated edits are saved with a single write
+SETTINGS_SAVE_DELAY = 500
+
+# cache of the EXIF data of the images already read
+exifCacheFile = "dji2metashape_exif.db"
+
 # set default values of flags
 # -------------------------------------------------
 exportTXT = dt.ValueProp(False)
@@ -48,7 +62,41 @@ isStdscaleflag = dt.ValueProp(False)
 isUTMflag = dt.ValueProp(False)
 isRAWflag = dt.ValueProp(True)
 isConvertRAWflag = dt.ValueProp(False)
-utmZones = ["32N", "33N", "34N"]
+utmZones = ("32N", "33N", "34N")
+
+
+# Section headers and "key = value" lines of the ini file
+INI_SECTION = re.compile(r"^\[([^\]]+)\][ \t]*$", re.M)
+INI_KEY_VALUE = re.compile(r"^([^=\s#;][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t]*$", re.M)
+
+
+def _fast_parse_ini(path: str) -> dict:
+    """Parse a flat ini file (section headers and "key = value" lines, as written by configparser) into a dictionary of sections. Keys are lower case, as in configparser; multi-line values are not supported."""
+    with open(path, "r") as f:
+        text = f.read()
+
+    # re.split returns [preamble, name1, body1, name2, body2, ...]
+    parts = INI_SECTION.split(text)
+    return {
+        name.strip(): {k.lower(): v for k, v in INI_KEY_VALUE.findall(body)}
+        for name, body in zip(parts[1::2], parts[2::2])
+    }
+
+
+@lru_cache(maxsize=1)
+def _load_ini(path: str, mtime_ns: int) -> dict:
+    """Parse an ini file into a dictionary of sections, with "None" values converted to None. The result is cached on the path and modification time of the file, so that it is parsed again only if it changes."""
+    return {
+        section: {k: (None if v == "None" else v) for k, v in values.items()}
+        for section, values in _fast_parse_ini(path).items()
+    }
+
+
+def load_settings(path: str = iniFile) -> dict:
+    """Returns the settings stored in the ini file as a dictionary of sections (empty if the file does not exist)."""
+    if not Path(path).exists():
+        return {}
+    return _load_ini(str(path), os.stat(path).st_mtime_ns)
 
 
 # GUI classes
@@ -160,31 +208,211 @@ class gui_dji2metashape(dt.DataSet):
 class gui_setting(dt.DataSet):
     """Settings"""
 
-    # Check if a config file exists, otherwise use default values
-    if not Path(iniFile).exists():
+    # Use the values of the config file, if it exists, otherwise the defaults
+    raw_settings = load_settings(iniFile).get("RAW", {})
+    if not raw_settings:
         logger.info("Config file not found. Using default values.")
-        rtroot = None
-        rtprofile = None
-        rtoptions = None
-    else:
-        config = configparser.ConfigParser()
-        config.read(iniFile)
 
-        rtroot = config["RAW"]["rtroot"]
-        if rtroot == "None":
-            rtroot = None
+    rtroot = di.DirectoryItem(
+        "RAW Therapee folder:", default=raw_settings.get("rtroot")
+    )
+    rtprofile = di.FileOpenItem(
+        "RAW Therapee profile:", "pp3", default=raw_settings.get("rtprofile")
+    )
+    rtoptions = di.TextItem(
+        "RAW Therapee cmd options:", default=raw_settings.get("rtoptions")
+    )
+
+
+# Errors expected during the conversion (missing or unreadable files, wrong
+# data in the files, locked EXIF cache), reported to the user with their
+# message. Any other exception is a bug, logged with its traceback.
+CONVERSION_ERRORS = (KeyError, ValueError, OSError, sqlite3.Error)
+
 
-        rtprofile = config["RAW"]["rtprofile"]
-        if rtprofile == "None":
-            rtprofile = None
+def validate_conversion_input(data: gui_dji2metashape) -> List[str]:
+    """Check the input of the conversion before starting it, so that wrong paths or options are reported before reading the MRK file and the images.
 
-        rtoptions = config["RAW"]["rtoptions"]
-        if rtoptions == "None":
-            rtoptions = None
+    Args:
+        data (gui_dji2metashape): The dataset with the input of the conversion.
 
-    rtroot = di.DirectoryItem("RAW Therapee folder:", default=rtroot)
-    rtprofile = di.FileOpenItem("RAW Therapee profile:", "pp3", default=rtprofile)
-    rtoptions = di.TextItem("RAW Therapee cmd options:", default=rtoptions)
+    Returns:
+        List[str]: The list of the errors found (empty if the input is valid).
+    """
+    errors = []
+    if not data.logfile or not Path(data.logfile).is_file():
+        errors.append(f"Drone log file {data.logfile} not found.")
+    if not data.imgfold or not Path(data.imgfold).is_dir():
+        errors.append(f"Image folder {data.imgfold} not found.")
+    if data.utmZone is None or not 0 <= data.utmZone < len(utmZones):
+        errors.append(f"Invalid UTM zone {data.utmZone}.")
+    if not (data.isXLS or data.isCSV):
+        errors.append("No output selected (Excel or CSV file).")
+    for enabled, fname, name in [
+        (data.isXLS, data.xlsfile, "Excel"),
+        (data.isCSV, data.csvfile, "CSV"),
+    ]:
+        if enabled and (not fname or not Path(fname).parent.is_dir()):
+            errors.append(f"Invalid {name} output file {fname}.")
+    return errors
+
+
+# Fields of the form that define the output of a conversion
+SIGNATURE_FIELDS = (
+    "logfile",
+    "imgfold",
+    "fileExtension",
+    "isUTM",
+    "utmZone",
+    "useImageCoord",
+    "isStdscale",
+    "fixed_stdscale",
+    "fixed_flagval",
+    "float_stdscale",
+    "float_flagval",
+    "auton_stdscale",
+    "auton_flagval",
+    "isCSV",
+    "csvfile",
+    "isXLS",
+    "xlsfile",
+)
+
+
+def conversion_signature(data: gui_dji2metashape) -> tuple:
+    """Returns the signature of the input of a conversion: the values of the form and the modification times of the log file and of the image folder (which changes when images are added or removed)."""
+    return (
+        tuple(getattr(data, name) for name in SIGNATURE_FIELDS),
+        os.stat(data.logfile).st_mtime_ns,
+        os.stat(data.imgfold).st_mtime_ns,
+    )
+
+
+def output_mtimes(data: gui_dji2metashape) -> tuple:
+    """Returns the modification times of the selected output files (None for the missing ones)."""
+    return tuple(
+        os.stat(fname).st_mtime_ns if os.path.isfile(fname) else None
+        for enabled, fname in [(data.isXLS, data.xlsfile), (data.isCSV, data.csvfile)]
+        if enabled
+    )
+
+
+class ConversionWorker(QObject):
+    """Runs the conversion of the DJI data in a background thread, so that the window stays responsive while the images are read."""
+
+    # Emitted at the end of the conversion with the outcome and the error message (if any)
+    finished = pyqtSignal(bool, str)
+    # Emitted with the percentage of images whose EXIF data have been read
+    progress = pyqtSignal(int)
+
+    def __init__(self, data: gui_dji2metashape):
+        QObject.__init__(self)
+        self.data = data
+        self._percent = -1
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.convert()
+        except CONVERSION_ERRORS as e:
+            if LOG_LEVEL <= logging.DEBUG:
+                logger.exception("Error during file conversion")
+            else:
+                logger.error(f"Error during file conversion: {e}")
+            self.finished.emit(False, f"{type(e).__name__}: {e}")
+        except Exception as e:
+            # An exception escaping the slot would abort the application and
+            # leave the window disabled: always report back to it
+            logger.exception("Unexpected error during file conversion")
+            self.finished.emit(False, f"Unexpected error: {type(e).__name__}: {e}")
+        else:
+            self.finished.emit(True, "")
+
+    def report_progress(self, read: int, total: int):
+        # Emit only when the percentage changes, not for every image
+        percent = 100 * read // total
+        if percent != self._percent:
+            self._percent = percent
+            self.progress.emit(percent)
+
+    def convert(self):
+        # Imported here, so that the first conversion (and not the window
+        # creation) pays for loading the processing modules
+        import impreproc.dji as dji
+        from impreproc.images import read_image_list
+
+        data = self.data
+        data_dir = data.imgfold
+        mrk_file = data.logfile
+        if data.fileExtension:
+            image_ext = "dng"
+        else:
+            image_ext = "jpg"
+        utm_zone = utmZones[data.utmZone]
+
+        # The MRK file is parsed again only if it changed since the last conversion
+        mrk_dict = dji.mrkread_cached(mrk_file)
+        # Read only the EXIF data of the images that are not in the cache (or
+        # that changed since they were cached)
+        with ExifCache(exifCacheFile) as cache:
+            exif_dict, files = cache.get(read_image_list(data_dir, image_ext))
+            if files:
+                # Use threads, as worker processes would re-import this GUI module on Windows
+                new_exif = dji.read_images_exif(
+                    files,
+                    use_processes=False,
+                    progress_callback=self.report_progress,
+                )
+                cache.put(new_exif)
+                exif_dict.update(new_exif)
+        merged_data = dji.merge_mrk_exif_data(mrk_dict, exif_dict)
+        if data.isXLS == True:
+            if data.isStdscale == True:
+                if not dji.dji2xlsx(
+                    merged_data,
+                    data.xlsfile,
+                    flag_utm=int(data.isUTM),
+                    utm_zone=utm_zone,
+                    flag_qual=[
+                        data.fixed_flagval,
+                        data.float_flagval,
+                        data.auton_flagval,
+                    ],
+                    scale_factors=[
+                        data.fixed_stdscale,
+                        data.float_stdscale,
+                        data.auton_stdscale,
+                    ],
+                ):
+                    raise OSError("Error when creating the excel file.")
+            else:
+                if not dji.dji2xlsx(
+                    merged_data,
+                    data.xlsfile,
+                    flag_utm=int(data.isUTM),
+                    utm_zone=utm_zone,
+                ):
+                    raise OSError("Error when creating the excel file.")
+
+        if data.isCSV == True:
+            if not dji.dji2csv(
+                data_dict=merged_data,
+                foutname=data.csvfile,
+                flag_utm=data.isUTM,
+                utm_zone=utm_zone,
+                flag_useImageCoord=data.useImageCoord,
+                flag_qual=[
+                    data.fixed_flagval,
+                    data.float_flagval,
+                    data.auton_flagval,
+                ],
+                scale_factors=[
+                    data.fixed_stdscale,
+                    data.float_stdscale,
+                    data.auton_stdscale,
+                ],
+            ):
+                raise OSError("Error when creating the csv file.")
 
 
 class MainWindow(QMainWindow):
@@ -213,6 +441,38 @@ class MainWindow(QMainWindow):
         splitter = QSplitter(self)
         splitter.addWidget(self.groupbox1)
         self.setCentralWidget(splitter)
+
+        # Progress of the EXIF data reading
+        self.progressbar = QProgressBar(self)
+        self.progressbar.setRange(0, 100)
+        self.statusBar().addPermanentWidget(self.progressbar)
+
+        # Message box of the conversion outcome, created once and reused
+        self._msg_box = QMessageBox(parent=self)
+        self._msg_box.setStandardButtons(QMessageBox.Ok)
+
+        # Settings, kept in a single ConfigParser initialized from the ini
+        # file (if any) and written to disk shortly after the last edit
+        self._config_parser = configparser.ConfigParser()
+        self._config_parser.read_dict(
+            {
+                s: {k: str(v) for k, v in kv.items()}
+                for s, kv in load_settings(iniFile).items()
+            }
+        )
+        self._settings_timer = QTimer(self)
+        self._settings_timer.setSingleShot(True)
+        self._settings_timer.setInterval(SETTINGS_SAVE_DELAY)
+        self._settings_timer.timeout.connect(self.save_settings)
+
+        # Signature of the input and modification times of the output files
+        # of the last successful conversion, to skip converting the same
+        # input again
+        self._last_conversion = None
+        self._pending_signature = None
+        # Thread and worker of the conversion running (if any)
+        self._thread = None
+        self._worker = None
         # self.setContentsMargins(10, 5, 10, 5)
 
         # File menu
@@ -239,100 +499,106 @@ class MainWindow(QMainWindow):
         add_actions(edit_menu, (setting_action,))
 
     def makeconversion(self):
-        # make conversion
+        # Check the input before reading any file
+        errors = validate_conversion_input(self.groupbox1.dataset)
+        if errors:
+            self.conversion_done(False, "\n".join(errors))
+            return
+
+        # Nothing to do if the input did not change since the last conversion
+        # and its output files are still the ones written by it
         data = self.groupbox1.dataset
-        settings = self.groupbox2.dataset
-
-        data_dir = data.imgfold
-        mrk_file = data.logfile
-        if data.fileExtension:
-            image_ext = "dng"
-        else:
-            image_ext = "jpg"
-
-        mrk_dict = dji.mrkread(mrk_file)
-        exif_dict = dji.get_images(data_dir, image_ext)
-        merged_data = dji.merge_mrk_exif_data(mrk_dict, exif_dict)
-        try:
-            if data.isXLS == True:
-                if data.isStdscale == True:
-                    if not dji.dji2xlsx(
-                        merged_data,
-                        data.xlsfile,
-                        flag_utm=int(data.isUTM),
-                        utm_zone=utmZones[data.utmZone],
-                        flag_qual=[
-                            data.fixed_flagval,
-                            data.float_flagval,
-                            data.auton_flagval,
-                        ],
-                        scale_factors=[
-                            data.fixed_stdscale,
-                            data.float_stdscale,
-                            data.auton_stdscale,
-                        ],
-                    ):
-                        raise Exception("Error when creating the excel fiel.")
-                else:
-                    if not dji.dji2xlsx(
-                        merged_data,
-                        data.xlsfile,
-                        flag_utm=int(data.isUTM),
-                        utm_zone=utmZones[data.utmZone],
-                    ):
-                        raise Exception("Error when creating the excel fiel.")
-
-            if data.isCSV == True:
-                if not dji.dji2csv(
-                    data_dict=merged_data,
-                    foutname=data.csvfile,
-                    flag_utm=data.isUTM,
-                    utm_zone=utmZones[data.utmZone],
-                    flag_useImageCoord=data.useImageCoord,
-                    flag_qual=[
-                        data.fixed_flagval,
-                        data.float_flagval,
-                        data.auton_flagval,
-                    ],
-                    scale_factors=[
-                        data.fixed_stdscale,
-                        data.float_stdscale,
-                        data.auton_stdscale,
-                    ],
-                ):
-                    raise Exception("Error when creating the csv fiel.")
-
+        signature = conversion_signature(data)
+        if self._last_conversion == (signature, output_mtimes(data)):
+            msg = self._msg_box
+            msg.setIcon(QMessageBox.Information)
+            msg.setText("Output files already up to date.")
+            msg.setWindowTitle("dji2metashape")
+            msg.exec_()
+            return
+        self._pending_signature = signature
+
+        # Run the conversion in a background thread, with the input form
+        # disabled until it is completed
+        self.groupbox1.setEnabled(False)
+        self._thread = QThread(self)
+        self._worker = ConversionWorker(self.groupbox1.dataset)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.finished.connect(self._thread.quit)
+        self._worker.finished.connect(self._worker.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+        self._worker.finished.connect(self.conversion_done)
+        self._worker.progress.connect(self.progressbar.setValue)
+        self.progressbar.setValue(0)
+        self._thread.start()
+
+    def conversion_done(self, success: bool, error: str):
+        # Release the thread of the conversion (already asked to quit) and
+        # its worker, which are deleted by deleteLater
+        if self._thread is not None:
+            self._thread.wait()
+            self._thread = None
+            self._worker = None
+        self.groupbox1.setEnabled(True)
+        msg = self._msg_box
+        if success:
+            self._last_conversion = (
+                self._pending_signature,
+                output_mtimes(self.groupbox1.dataset),
+            )
             # done message
-            msg = QMessageBox(parent=self)
             msg.setIcon(QMessageBox.Information)
             msg.setText("File correctly converted!")
             msg.setWindowTitle("dji2metashape")
-            msg.setStandardButtons(QMessageBox.Ok)
-            retval = msg.exec_()
+            msg.exec_()
 
             # clean the fields
             # self.groupbox1.dataset.fin = ""
             # self.groupbox1.dataset.fout = ""
             # self.groupbox1.get()
 
-        except Exception as e:
-            # error message
-            msg = QMessageBox(parent=self)
+        else:
+            # error message (with the error type)
             msg.setIcon(QMessageBox.Critical)
-            msg.setText(
-                f"Error during file conversion: {e}"
-            )  # TODO: add the error type to the message
+            msg.setText(f"Error during file conversion: {error}")
             msg.setWindowTitle("Done")
-            msg.setStandardButtons(QMessageBox.Ok)
-            retval = msg.exec_()
+            msg.exec_()
 
     def setting_window(self):
         if self.groupbox2.dataset.edit(parent=self, size=(600, 10)):
-            config = self.groupbox2.dataset.config
-            config["RAW"]["rtroot"] = self.groupbox2.dataset.rtroot
-            config["RAW"]["rtprofile"] = self.groupbox2.dataset.rtprofile
-            with open(iniFile, "w") as configfile:  # save
-                config.write(configfile)
+            config = self._config_parser
+            if not config.has_section("RAW"):
+                config.add_section("RAW")
+            config["RAW"]["rtroot"] = str(self.groupbox2.dataset.rtroot)
+            config["RAW"]["rtprofile"] = str(self.groupbox2.dataset.rtprofile)
+            if not config.has_option("RAW", "rtoptions"):
+                config["RAW"]["rtoptions"] = str(self.groupbox2.dataset.rtoptions)
+            # (re)start the timer, so that repeated edits are saved once
+            self._settings_timer.start()
+
+    def save_settings(self):
+        with open(iniFile, "w") as configfile:
+            self._config_parser.write(configfile)
+        _load_ini.cache_clear()
+
+    def closeEvent(self, event):
+        # Do not close the window during a conversion, which would destroy its
+        # running thread and leave the output files half written
+        if self._thread is not None and self._thread.isRunning():
+            QMessageBox.warning(
+                self,
+                "dji2metashape",
+                "Wait for the conversion to complete before closing the window.",
+            )
+            event.ignore()
+            return
+
+        # Save the settings still waiting to be written
+        if self._settings_timer.isActive():
+            self._settings_timer.stop()
+            self.save_settings()
+        QMainWindow.closeEvent(self, event)
 
 
 if __name__ == "__main__":
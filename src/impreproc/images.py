@@ -1,12 +1,74 @@
 import logging
+import mmap
+import os
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from importlib import import_module
 from pathlib import Path
-from typing import List, Union
+from typing import Iterator, List, Tuple, Union
 
 import cv2
 import exifread
 import numpy as np
+from exifread.utils import Ratio
+
+# Buffer size used to read the EXIF data: the EXIF block is at the head of JPEG
+# and DNG files, so it is fetched with a single read (further reads, if any,
+# are served from the file as usual)
+EXIF_READ_BUFFER_SIZE = 131072
+
+# EXIF tags read by read_exif_fast, by IFD ({tag id: tag name}), named as in exifread
+EXIF_FAST_TAGS = {
+    "Image": {
+        0x0100: "ImageWidth",
+        0x0101: "ImageLength",
+        0x010F: "Make",
+        0x0110: "Model",
+        0x0132: "DateTime",
+    },
+    "EXIF": {
+        0x9003: "DateTimeOriginal",
+        0x920A: "FocalLength",
+        0xA002: "ExifImageWidth",
+        0xA003: "ExifImageLength",
+    },
+    "GPS": {
+        0x0001: "GPSLatitudeRef",
+        0x0002: "GPSLatitude",
+        0x0003: "GPSLongitudeRef",
+        0x0004: "GPSLongitude",
+        0x0005: "GPSAltitudeRef",
+        0x0006: "GPSAltitude",
+    },
+}
+# Tags of IFD0 pointing to the EXIF and GPS IFDs
+EXIF_IFD_POINTERS = {0x8769: "EXIF", 0x8825: "GPS"}
+# struct format of the integer, ASCII and rational TIFF field types (other
+# types are not used by the tags above)
+TIFF_FIELD_FORMATS = {
+    1: "B",
+    2: "s",
+    3: "H",
+    4: "I",
+    5: "II",
+    6: "b",
+    7: "B",
+    8: "h",
+    9: "i",
+    10: "ii",
+}
+# JPEG start of frame markers, holding the image size (0xFFC4, 0xFFC8 and
+# 0xFFCC are other markers in the same range)
+JPEG_SOF_MARKERS = set(range(0xFFC0, 0xFFD0)) - {0xFFC4, 0xFFC8, 0xFFCC}
+# OpenCV flags (grayscale, color) to decode a JPEG image directly at 1/2, 1/4
+# or 1/8 of its resolution
+IMREAD_REDUCED_FLAGS = {
+    2: (cv2.IMREAD_REDUCED_GRAYSCALE_2, cv2.IMREAD_REDUCED_COLOR_2),
+    4: (cv2.IMREAD_REDUCED_GRAYSCALE_4, cv2.IMREAD_REDUCED_COLOR_4),
+    8: (cv2.IMREAD_REDUCED_GRAYSCALE_8, cv2.IMREAD_REDUCED_COLOR_8),
+}
 
 
 class ImageList:
@@ -24,7 +86,6 @@ class ImageList:
             data_dir (Union[str, Path]): A string or Path object specifying the directory path containing image files.
             image_ext (Union[str, List[str]], optional): A string or list of strings specifying the image file extensions to search for. Defaults to None, which searches for all file types.
             recursive (bool, optional): Whether to search for image files recursively in subdirectories. Defaults to False.
-            case_sensitive (bool, optional): Whether to search for image files with case sensitivity. Defaults to False.
 
         Example:
 
@@ -33,13 +94,7 @@ class ImageList:
         >>> data_dir = Path("/path/to/image/directory")
         >>> image_list = ImageList(data_dir, image_ext=["jpg", "png"], recursive=True)
 
-        TODO:
-            Fix case-sensitive search in Linux environments.
-
         """
-        logging.warning(
-            "ImageList class is currentely case-sensitive in Linux environments. This will be fixed in the next release."
-        )
         self._files = read_image_list(
             data_dir=data_dir,
             image_ext=image_ext,
@@ -93,6 +148,33 @@ class ImageList:
     def get_image_stem(self, idx):
         return self._files[idx].stem
 
+    def prefetch(self, n: int = 8) -> Iterator[Tuple[Path, bytes]]:
+        """
+        Iterates over the images yielding their path and the content of the file, while a pool of threads reads the next n files in the background, so that reading the files overlaps with processing them.
+
+        Args:
+            n (int, optional): Number of files read ahead. Defaults to 8.
+
+        Yields:
+            Tuple[Path, bytes]: The path of the image and the content of the file, which can be decoded with cv2.imdecode(np.frombuffer(data, np.uint8), flag).
+
+        Example:
+
+        >>> for path, data in image_list.prefetch():
+        >>>     image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        """
+        assert n > 0, "The number of files to prefetch must be positive."
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            pending = deque()
+            for file in self._files:
+                pending.append((file, executor.submit(file.read_bytes)))
+                if len(pending) > n:
+                    path, data = pending.popleft()
+                    yield path, data.result()
+            while pending:
+                path, data = pending.popleft()
+                yield path, data.result()
+
 
 class Image:
     """A class representing an image.
@@ -104,32 +186,44 @@ class Image:
         _height (int): The height of the image in pixels.
         _exif_data (dict): The EXIF metadata of the image, if available.
         _date_time (datetime): The date and time the image was taken, if available.
+        _exif_loaded (bool): Whether the EXIF metadata have been read. They are read on the first access to the EXIF data, size or date-time of the image.
 
     """
 
-    def __init__(self, path: Union[str, Path], image: np.ndarray = None) -> None:
+    def __init__(
+        self, path: Union[str, Path], image: np.ndarray = None, fast_exif: bool = True
+    ) -> None:
         """
         __init__ Create Image object
 
         Args:
             path (Union[str, Path]): path to the image
             image (np.ndarray, optional): Numpy array containing pixel values. If provided, they are stored in self._value_array and they are accessible from outside the class with Image.value. Defaults to None.
+            fast_exif (bool, optional): If True, only the EXIF tags used by impreproc are read with read_exif_fast (falling back to exifread for the unsupported files). If False, all the EXIF tags are read with exifread. Defaults to True.
         """
 
         self._path = Path(path)
+        self._fast_exif = fast_exif
         self._value_array = None
         self._width = None
         self._height = None
         self._exif_data = None
         self._date_time = None
-        self.read_exif()
+        # EXIF data are read lazily (see _ensure_exif)
+        self._exif_loaded = False
 
         if image:
             self._value_array = image
 
+    def _ensure_exif(self) -> None:
+        """Read the EXIF data, if they have not been read yet."""
+        if not self._exif_loaded:
+            self.read_exif()
+
     @property
     def height(self) -> int:
         """Returns the height of the image"""
+        self._ensure_exif()
         if self._height:
             return int(self._height)
         else:
@@ -139,6 +233,7 @@ class Image:
     @property
     def width(self) -> int:
         """Returns the width of the image"""
+        self._ensure_exif()
         if self._width:
             return int(self._width)
         else:
@@ -178,6 +273,7 @@ class Image:
         Returns:
             dict: Dictionary containing Exif information
         """
+        self._ensure_exif()
         return self._exif_data
 
     @property
@@ -189,6 +285,7 @@ class Image:
         Returns:
             str or None: The date and time of the image in the format "YYYY:MM:DD HH:MM:SS", or None if not available.
         """
+        self._ensure_exif()
         if self._date_time is not None:
             return self._date_time.strftime("%Y:%m:%d")
         else:
@@ -201,6 +298,7 @@ class Image:
         time Returns the time of the image from exif as a string
 
         """
+        self._ensure_exif()
         if self._date_time is not None:
             return self._date_time.strftime("%H:%M:%S")
         else:
@@ -225,6 +323,7 @@ class Image:
         Returns:
             datetime: The date and time of the image as datetime object
         """
+        self._ensure_exif()
         if self._date_time is not None:
             return self._date_time
         else:
@@ -242,7 +341,6 @@ class Image:
         # path = Path(path)
         if self.path.exists():
             self._value_array = read_image(self.path, col, resize, crop)
-            self.read_exif()
         else:
             logging.error(f"Input paht {self.path} not valid.")
 
@@ -252,8 +350,10 @@ class Image:
     def read_exif(self) -> None:
         """Reads the Exchangeable image file format (EXIF) metadata of an image file and stores them in a dictionary.
 
-        This function reads the EXIF data of an image file using the exifread library, and then stores the metadata
-        in a dictionary. The image path is specified by the `_path` attribute of the Image object.
+        This function reads the EXIF data of an image file, and then stores the metadata in a dictionary. The image
+        path is specified by the `_path` attribute of the Image object. If the Image was created with fast_exif=True,
+        only the tags used by impreproc are read with read_exif_fast, otherwise (or if the file layout is not supported
+        by read_exif_fast) all the tags are read with the exifread library.
 
         If no EXIF data is available for the image, an error message will be logged.
 
@@ -267,10 +367,16 @@ class Image:
         Returns:
             None
         """
+        self._exif_loaded = True
         try:
-            f = open(self._path, "rb")
-            self._exif_data = exifread.process_file(f, details=False)
-            f.close()
+            exif = read_exif_fast(self._path) if self._fast_exif else None
+            if exif is None:
+                # Skip MakerNotes and thumbnail extraction, which are not needed
+                with open(self._path, "rb", buffering=EXIF_READ_BUFFER_SIZE) as f:
+                    exif = exifread.process_file(
+                        f, details=False, extract_thumbnail=False
+                    )
+            self._exif_data = exif
         except:
             logging.error("No exif data available.")
 
@@ -289,11 +395,13 @@ class Image:
             self._height = self._exif_data["EXIF ExifImageLength"].printable
         else:
             logging.error(
-                "Image width and height found in exif. Try to load the image and get image size from numpy array"
+                "Image width and height not found in exif. Try to get the image size from the image file"
             )
             try:
-                img = Image(self.path)
-                self.height, self.width = img.height, img.width
+                if self._value_array is not None:
+                    self._height, self._width = self._value_array.shape[:2]
+                else:
+                    self._width, self._height = read_image_size(self.path)
 
             except:
                 raise RuntimeError("Unable to get image dimensions.")
@@ -307,7 +415,21 @@ class Image:
         else:
             logging.error("Date not available in exif.")
             return
-        self._date_time = datetime.strptime(date_str, self._date_time_fmt)
+        # The EXIF date-time has a fixed "YYYY:MM:DD HH:MM:SS" layout, so it is
+        # sliced directly (strptime is used only for non-standard strings)
+        try:
+            if len(date_str) != 19:
+                raise ValueError
+            self._date_time = datetime(
+                int(date_str[0:4]),
+                int(date_str[5:7]),
+                int(date_str[8:10]),
+                int(date_str[11:13]),
+                int(date_str[14:16]),
+                int(date_str[17:19]),
+            )
+        except ValueError:
+            self._date_time = datetime.strptime(date_str, self._date_time_fmt)
 
     def extract_patch(self, limits: List[int]) -> np.ndarray:
         """
@@ -319,12 +441,8 @@ class Image:
         Returns:
             np.ndarray: The image patch extracted from the image.
         """
-        image = read_image(self._path)
-        patch = image[
-            limits[1] : limits[3],
-            limits[0] : limits[2],
-        ]
-        return patch
+        # The colors of the patch only are converted
+        return read_image(self._path, crop=limits)
 
     def get_intrinsics_from_exif(self) -> np.ndarray:
         """Constructs the camera intrinsics from exif tag.
@@ -343,19 +461,19 @@ class Image:
         """
         sens_db = import_module("impreproc.utils.sensor_width_database")
 
-        if self._exif_data is None or len(self._exif_data) == 0:
+        if not self._exif_loaded or not self._exif_data:
             try:
                 self.read_exif()
             except OSError:
                 logging.error("Unable to read exif data.")
                 return None
         try:
-            focal_length_mm = float(self._exif_data["EXIF FocalLength"].printable)
+            focal_length_mm = float(self._exif_data["EXIF FocalLength"].values[0])
         except OSError:
             logging.error("Focal length non found in exif data.")
             return None
         try:
-            sensor_width_db = sens_db.SensorWidthDatabase()
+            sensor_width_db = sens_db.get_sensor_width_database()
             sensor_width_mm = sensor_width_db.lookup(
                 self._exif_data["Image Make"].printable,
                 self._exif_data["Image Model"].printable,
@@ -391,23 +509,144 @@ class Image:
             out_path (str, optional): Path for writing the undistorted image to disk. If out_path is None, undistorted image is not saved to disk. Defaults to None.
 
         Returns:
-            np.ndarray: Undistorted image as a numpy array.
+            np.ndarray: Undistorted image as a numpy array (in the BGR channel order of OpenCV).
         """
 
-        self.read_image()
+        # Always read the full image (the array already loaded may be cropped
+        # or resized), directly in the BGR order used by OpenCV, instead of
+        # converting it to RGB (read_image) and back
+        image = cv2.imread(str(self._path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise RuntimeError(f"Unable to read image {self._path}")
 
-        image_und = cv2.undistort(
-            cv2.cvtColor(self._value_array, cv2.COLOR_RGB2BGR),
-            K,
-            dist,
-            None,
-            K,
-        )
+        image_und = cv2.undistort(image, K, dist, None, K)
         if out_path is not None:
             cv2.imwrite(out_path, image_und)
         return image_und
 
 
+class ExifTag:
+    """An EXIF tag read by read_exif_fast, with the same `values` and `printable` attributes as the tags returned by exifread."""
+
+    __slots__ = ("tag", "field_type", "values", "printable")
+
+    def __init__(self, tag: int, field_type: int, values, printable: str) -> None:
+        self.tag = tag
+        self.field_type = field_type
+        self.values = values
+        self.printable = printable
+
+    def __str__(self) -> str:
+        return self.printable
+
+    def __repr__(self) -> str:
+        return f"(0x{self.tag:04X}) {self.printable}"
+
+
+def _parse_tiff_tags(data: bytes) -> dict:
+    """Parse the tags of EXIF_FAST_TAGS from a TIFF block (the content of the EXIF segment of a JPEG or a memory-mapped TIFF/DNG file).
+
+    Raises:
+        ValueError: If the block is not a valid TIFF block or the tags point outside of it.
+    """
+    endian = {b"II": "<", b"MM": ">"}.get(data[:2])
+    if endian is None or struct.unpack_from(endian + "H", data, 2)[0] != 42:
+        raise ValueError("Invalid TIFF header.")
+
+    tags = {}
+    ifds = [("Image", struct.unpack_from(endian + "I", data, 4)[0])]
+    while ifds:
+        ifd_name, offset = ifds.pop()
+        wanted = EXIF_FAST_TAGS[ifd_name]
+        (n_entries,) = struct.unpack_from(endian + "H", data, offset)
+        for entry in range(offset + 2, offset + 2 + 12 * n_entries, 12):
+            tag, field_type, count = struct.unpack_from(endian + "HHI", data, entry)
+            if ifd_name == "Image" and tag in EXIF_IFD_POINTERS:
+                ifds.append(
+                    (
+                        EXIF_IFD_POINTERS[tag],
+                        struct.unpack_from(endian + "I", data, entry + 8)[0],
+                    )
+                )
+                continue
+            fmt = TIFF_FIELD_FORMATS.get(field_type)
+            if tag not in wanted or fmt is None:
+                continue
+
+            # Values longer than 4 bytes are stored at the offset in the entry
+            size = struct.calcsize(fmt) * count
+            pos = entry + 8
+            if size > 4:
+                (pos,) = struct.unpack_from(endian + "I", data, pos)
+            if pos + size > len(data):
+                raise ValueError(f"Tag 0x{tag:04X} outside of the TIFF block.")
+            if field_type == 2:
+                values = data[pos : pos + count].split(b"\x00", 1)[0]
+                values = values.decode("utf-8", errors="replace")
+                printable = values
+            else:
+                raw = struct.unpack_from(
+                    f"{endian}{count * len(fmt)}{fmt[0]}", data, pos
+                )
+                if len(fmt) == 2:
+                    values = [Ratio(raw[i], raw[i + 1]) for i in range(0, len(raw), 2)]
+                else:
+                    values = list(raw)
+                printable = str(values[0]) if count == 1 else str(values)
+            tags[f"{ifd_name} {wanted[tag]}"] = ExifTag(
+                tag, field_type, values, printable
+            )
+
+    return tags
+
+
+def read_exif_fast(path: Union[str, Path]) -> Union[dict, None]:
+    """Read only the EXIF tags used by impreproc (see EXIF_FAST_TAGS: image size, make, model, date-time, focal length and GPS position) from a JPEG, PNG, TIFF or DNG file.
+
+    The EXIF segment of a JPEG file is located by walking the markers at the head of the file and the eXIf chunk of a PNG file by walking the chunk headers (seeking over their data), while TIFF/DNG files are memory-mapped, so that only the pages holding the IFDs and their values are read, wherever they are in the file. Only the IFD0, EXIF and GPS IFDs are visited, without parsing the other tags, the MakerNote or the thumbnail.
+
+    Args:
+        path (Union[str, Path]): Path to the image file.
+
+    Returns:
+        Union[dict, None]: Dictionary of the tags (with the same keys, values and printable of exifread) or None if the file layout is not supported (e.g., an EXIF segment that is not at the head of a JPEG file), in which case the file should be read with exifread.
+    """
+    with open(path, "rb", buffering=EXIF_READ_BUFFER_SIZE) as f:
+        head = f.read(EXIF_READ_BUFFER_SIZE)
+        try:
+            if head[:2] == b"\xff\xd8":
+                # JPEG: walk the segments until the EXIF one (APP1)
+                pos = 2
+                while True:
+                    marker, length = struct.unpack(">HH", head[pos : pos + 4])
+                    if marker in (0xFFDA, 0xFFD9) or marker >> 8 != 0xFF:
+                        return {}  # start of the image data: no EXIF
+                    if marker == 0xFFE1 and head[pos + 4 : pos + 10] == b"Exif\x00\x00":
+                        if pos + 2 + length > len(head):
+                            f.seek(pos + 10)
+                            return _parse_tiff_tags(f.read(length - 8))
+                        return _parse_tiff_tags(head[pos + 10 : pos + 2 + length])
+                    pos += 2 + length
+            elif head[:8] == b"\x89PNG\r\n\x1a\n":
+                # PNG: walk the chunks until the EXIF one (eXIf)
+                pos = 8
+                while True:
+                    f.seek(pos)
+                    length, chunk_type = struct.unpack(">I4s", f.read(8))
+                    if chunk_type == b"eXIf":
+                        return _parse_tiff_tags(f.read(length))
+                    if chunk_type == b"IEND":
+                        return {}
+                    pos += 12 + length
+            elif head[:4] in (b"II*\x00", b"MM\x00*"):
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return _parse_tiff_tags(mm)
+        except (struct.error, ValueError):
+            pass
+
+    return None
+
+
 def latlonalt_from_exif(exif: dict) -> tuple:
     """Extracts the latitude, longitude, and altitude from the given EXIF data.
 
@@ -430,35 +669,51 @@ def latlonalt_from_exif(exif: dict) -> tuple:
         exif["GPS GPSAltitudeRef"].values[0] == 0
     ), "Altitude Reference is not WGS84. Unable to process image."
 
-    lat = (
-        np.float32(exif["GPS GPSLatitude"].values[0])
-        + np.float32(exif["GPS GPSLatitude"].values[1]) / 60
-        + np.float32(exif["GPS GPSLatitude"].values[2]) / 3600
-    )
-    lon = (
-        np.float32(exif["GPS GPSLongitude"].values[0])
-        + np.float32(exif["GPS GPSLongitude"].values[1]) / 60
-        + np.float32(exif["GPS GPSLongitude"].values[2]) / 3600
-    )
-    alt = np.float32(exif["GPS GPSAltitude"].values[0])
+    # Convert the degrees, minutes, seconds values (exifread Ratio) with the
+    # builtin float, which is faster than numpy scalars and keeps the double
+    # precision needed by the coordinates
+    lat_d, lat_m, lat_s = exif["GPS GPSLatitude"].values[:3]
+    lon_d, lon_m, lon_s = exif["GPS GPSLongitude"].values[:3]
+    lat = float(lat_d) + float(lat_m) / 60 + float(lat_s) / 3600
+    lon = float(lon_d) + float(lon_m) / 60 + float(lon_s) / 3600
+    alt = float(exif["GPS GPSAltitude"].values[0])
 
     return (lat, lon, alt)
 
 
+def _scan_dir(path: Union[str, Path], suffixes: tuple, recursive: bool = True) -> tuple:
+    """Returns the files of a directory ending with one of the (lower case) suffixes and, if recursive, its subdirectories.
+
+    The names are matched before checking the type of the entries, as on file systems that do not report the type in the directory listing (e.g., some network file systems) each check costs a stat call: only the matching entries are checked to be files, and the other ones to be directories only in recursive mode. Symbolic links to directories are not followed (as in Path.glob), to avoid loops and duplicates. The paths are returned as strings, to be converted to Path objects only once sorted.
+    """
+    files, subdirs = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(suffixes) and entry.is_file():
+                files.append(entry.path)
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    return files, subdirs
+
+
 def read_image_list(
     data_dir: Union[str, Path],
     image_ext: Union[str, List[str]] = None,
     # name_pattern: str = None,
     recursive: bool = False,
     # case_sensitive: bool = False,
+    max_workers: int = None,
 ) -> List[Path]:
     """
     Returns a list of Path objects for all image files in a directory.
 
+    The directory is scanned once with os.scandir (which reuses the file type returned by the directory listing, without a stat call per file) and the extensions are matched case-insensitively. In recursive mode, the subdirectories of each level of the tree are scanned in parallel by a pool of threads, as listing directories is I/O bound (e.g., on network file systems).
+
     Args:
         data_dir (Union[str, Path]): A string or Path object specifying the directory path containing image files.
-        image_ext (Union[str, List[str]], optional): A string or list of strings specifying the image file extensions to search for. Defaults to None, which searches for all file types.
+        image_ext (Union[str, List[str]], optional): A string or list of strings specifying the image file extensions to search for (case-insensitive). Defaults to None, which searches for all file types.
         recursive (bool, optional): Whether to search for image files recursively in subdirectories. Defaults to False.
+        max_workers (int, optional): Maximum number of threads used to scan the subdirectories in recursive mode. Defaults to None (ThreadPoolExecutor default).
 
     Returns:
         [Path]: A list of Path objects for all image files found in the specified directory with the specified file extensions and name pattern.
@@ -469,7 +724,6 @@ def read_image_list(
 
     TODO:
         Implement custom name patterns.
-        Removed case_sensitive option for now as Windows is case-insensitive by default and the current algorithm dupicated the files when reading the file list. Need to find a way to make it work on both Windows and Linux.
 
     """
     data_dir = Path(data_dir)
@@ -483,27 +737,98 @@ def read_image_list(
         if isinstance(image_ext, str):
             image_ext = [image_ext]
         assert all([len(x) == 3 for x in image_ext]), msg
-        # if not case_sensitive:
-        #     # Make glob search case-insensitive
-        #     image_ext_lower = [x.lower() for x in image_ext]
-        #     image_ext_upper = [x.upper() for x in image_ext]
-        #     image_ext = image_ext_lower + image_ext_upper
-
-        ext_patt = [f".{x}" for x in image_ext]
+        suffixes = tuple(f".{x.lower()}" for x in image_ext)
     else:
-        ext_patt = [""]
+        suffixes = ("",)
 
+    if not recursive:
+        files, _ = _scan_dir(data_dir, suffixes, recursive=False)
+        return _sorted_paths(files)
+
+    # Scan the tree level by level, with all the directories of a level
+    # scanned in parallel
     files = []
-    for ext in ext_patt:
-        if recursive:
-            pattern = f"**/*{ext}"
-        else:
-            pattern = f"*{ext}"
-        files.extend(list(data_dir.glob(pattern)))
+    dirs = [data_dir]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while dirs:
+            subdirs = []
+            for dir_files, dir_subdirs in executor.map(
+                lambda d: _scan_dir(d, suffixes), dirs
+            ):
+                files.extend(dir_files)
+                subdirs.extend(dir_subdirs)
+            dirs = subdirs
+
+    return _sorted_paths(files)
 
-    files = sorted(files)
 
-    return files
+def _sorted_paths(paths: List[str]) -> List[Path]:
+    """Sorts a list of paths as strings, in the same order as sorting them as Path objects (i.e., component by component), and converts them to Path objects."""
+    paths = sorted(paths, key=lambda p: os.path.normcase(p).split(os.sep))
+    return [Path(p) for p in paths]
+
+
+def read_image_size(path: Union[str, Path]) -> Tuple[int, int]:
+    """Returns the size of an image, reading only the header of the file with the imagesize package (if installed) and decoding the whole image otherwise (or if imagesize does not support the file format).
+
+    Args:
+        path (Union[str, Path]): Path to the image file.
+
+    Returns:
+        Tuple[int, int]: The width and height of the image in pixels.
+    """
+    try:
+        imagesize = import_module("imagesize")
+        width, height = imagesize.get(str(path))
+        if width > 0 and height > 0:
+            return width, height
+    except ImportError:
+        pass
+
+    size = read_jpeg_size(path)
+    if size is not None:
+        return size
+
+    height, width = read_image(path).shape[:2]
+    return width, height
+
+
+def read_jpeg_size(path: Union[str, Path]) -> Union[Tuple[int, int], None]:
+    """Returns the size of a JPEG image, read from its start of frame segment (without applying the EXIF orientation).
+
+    Args:
+        path (Union[str, Path]): Path to the image file.
+
+    Returns:
+        Union[Tuple[int, int], None]: The width and height of the image in pixels, or None if the file is not a JPEG image.
+    """
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+        try:
+            while True:
+                marker, length = struct.unpack(">HH", f.read(4))
+                if marker in (0xFFDA, 0xFFD9) or marker >> 8 != 0xFF:
+                    return None
+                if marker in JPEG_SOF_MARKERS:
+                    height, width = struct.unpack(">xHH", f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+        except struct.error:
+            return None
+
+
+def _jpeg_reduction(w: int, h: int, resize: List[int]) -> int:
+    """Returns the largest JPEG decoding reduction (1, 2, 4 or 8) giving an image at least as large as the size requested by resize (see process_resize), whatever the EXIF orientation of the image."""
+    w_new, h_new = process_resize(w, h, resize)
+    if len(resize) == 2:
+        # A fixed size may be applied to the rotated image
+        w = h = min(w, h)
+        w_new = h_new = max(w_new, h_new)
+    for reduction in (8, 4, 2):
+        if w // reduction >= w_new and h // reduction >= h_new:
+            return reduction
+    return 1
 
 
 # @TODO: remove variable number of outputs
@@ -520,10 +845,13 @@ def read_image(
         path (Union[str, Path]): The path of the image.
         color (bool, optional): Whether to read the image as color (RGB) or grayscale. Defaults to True.
         resize (List[int], optional): If not [-1], image is resized at [width, height] dimensions. Defaults to [-1].
-        crop (List[int], optional): If not None, a List containing the bounding box for cropping the image as [xmin, xmax, ymin, ymax]. Defaults to None.
+        crop (List[int], optional): If not None, a List containing the bounding box for cropping the (resized) image as [xmin, ymin, xmax, ymax]. Defaults to None.
 
     Returns:
         np.ndarray: The image as a NumPy array.
+
+    Note:
+        JPEG images reduced to half of their size or less are decoded directly at 1/2, 1/4 or 1/8 of their resolution (which is much faster than decoding them at full resolution) and then resized to the requested size.
     """
 
     if color:
@@ -531,15 +859,20 @@ def read_image(
     else:
         flag = cv2.IMREAD_GRAYSCALE
 
+    reduction = 1
+    if not (len(resize) == 1 and resize[0] == -1):
+        size = read_jpeg_size(path)
+        if size is not None:
+            reduction = _jpeg_reduction(*size, resize)
+            if reduction > 1:
+                flag = IMREAD_REDUCED_FLAGS[reduction][color]
+
     try:
         image = cv2.imread(str(path), flag)
     except:
         logging.error(f"Impossible to load image {path}")
         return None, None
 
-    if color:
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
     if image is None:
         if len(resize) == 1 and resize[0] == -1:
             return None
@@ -547,12 +880,26 @@ def read_image(
             return None, None
 
     w, h = image.shape[1], image.shape[0]
+    if reduction > 1:
+        # Full resolution size, swapped if OpenCV rotated the image according
+        # to the EXIF orientation (the reduced size is rounded up)
+        if (w, h) == (-(-size[0] // reduction), -(-size[1] // reduction)):
+            w, h = size
+        else:
+            h, w = size
     w_new, h_new = process_resize(w, h, resize)
     scales = (float(w) / float(w_new), float(h) / float(h_new))
-    image = cv2.resize(image, (w_new, h_new))
+    # Resize only if the size changes (cv2.resize copies the image anyway)
+    if (w_new, h_new) != image.shape[1::-1]:
+        image = cv2.resize(image, (w_new, h_new))
     if crop:
         image = image[crop[1] : crop[3], crop[0] : crop[2]]
 
+    # Convert the colors after cropping, so that only the pixels returned are
+    # converted
+    if color:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
     if len(resize) == 1 and resize[0] == -1:
         return image
     else:
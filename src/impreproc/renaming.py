@@ -1,7 +1,10 @@
 import logging
 import multiprocessing
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from importlib import import_module
 from pathlib import Path
 from typing import List, Tuple, TypedDict, Union
 
@@ -14,6 +17,12 @@ from tqdm import tqdm
 from impreproc.camera import Camera
 from impreproc.images import Image, ImageList, latlonalt_from_exif
 
+# ioctl request to clone (reflink) a file on Linux copy-on-write file systems
+# (e.g., Btrfs, XFS)
+FICLONE = 0x40049409
+# Ways of transferring the renamed images to the destination folder
+COPY_MODES = ("copy", "hardlink", "reflink", "move")
+
 
 class RenamingDict(TypedDict):
     """A dictionary for storing metadata about an image being renamed. It maps the old image name to the new one and stores additional metadata about the image.
@@ -55,6 +64,7 @@ class ImageRenamer:
         prior_class_file (Union[str, Path], optional): A CSV file containing prior classification data. Defaults to None.
         delete_original (bool, optional): Whether to delete the original image after renaming. Defaults to False.
         parallel (bool, optional): Whether to use multiprocessing for faster renaming. Defaults to False.
+        copy_mode (str, optional): How the renamed images are created (see copy_and_rename). Defaults to "copy".
 
     Attributes:
         renaming_dict (dict): A dictionary of the old and new names, if build_dictionary is set to True.
@@ -87,6 +97,7 @@ class ImageRenamer:
         prior_class_file: Union[str, Path] = None,
         delete_original: bool = False,
         parallel: bool = False,
+        copy_mode: str = "copy",
     ) -> None:
         """Initializes the ImageRenamer class.
 
@@ -97,13 +108,16 @@ class ImageRenamer:
             prior_class_file (Union[str, Path], optional): A CSV file containing prior classification data. Defaults to None.
             delete_original (bool, optional): Whether to delete the original images after renaming. Defaults to False.
             parallel (bool, optional): Whether to use multiprocessing. Defaults to False.
+            copy_mode (str, optional): How the renamed images are created: "copy", "hardlink", "reflink" or "move" (see copy_and_rename). Defaults to "copy".
         """
+        assert copy_mode in COPY_MODES, f"copy_mode must be one of {COPY_MODES}"
         self.image_list = image_list
         self.dest_folder = Path(dest_folder)
         self.base_name = base_name
         self.progressive_ids = progressive_ids
         self.delete_original = delete_original
         self.parallel = parallel
+        self.copy_mode = copy_mode
 
         if self.progressive_ids and self.parallel:
             logging.warning(
@@ -147,19 +161,34 @@ class ImageRenamer:
             dest_folder=self.dest_folder,
             base_name=self.base_name,
             delete_original=self.delete_original,
+            copy_mode=self.copy_mode,
         )
         if self.parallel:
+            # Send the images to the workers in chunks, to reduce the
+            # inter-process communication, and sort the results by index
+            func = partial(_copy_and_rename_indexed, **func.keywords)
+            n_images = len(self.image_list)
+            chunksize = max(1, n_images // (4 * multiprocessing.cpu_count()))
             with multiprocessing.Pool() as p:
-                out = list(tqdm(p.imap(func, self.image_list)))
-            renaming_dict = {k: v for k, v in enumerate(out)}
+                out = dict(
+                    tqdm(
+                        p.imap_unordered(
+                            func, enumerate(self.image_list), chunksize=chunksize
+                        ),
+                        total=n_images,
+                    )
+                )
+            renaming_dict = {k: out[k] for k in range(n_images)}
 
         else:
-            renaming_dict = {}
-            for i, file in enumerate(tqdm(self.image_list)):
-                if self.progressive_ids:
-                    renaming_dict[i] = func(file, progressive_id=i)
-                else:
-                    renaming_dict[i] = func(file)
+            renaming_dict = rename_images(
+                self.image_list,
+                dest_folder=self.dest_folder,
+                base_name=self.base_name,
+                progressive_ids=self.progressive_ids,
+                delete_original=self.delete_original,
+                copy_mode=self.copy_mode,
+            )
 
         self.renaming_df = pd.DataFrame.from_dict(renaming_dict, orient="index")
 
@@ -237,7 +266,7 @@ def name_from_exif(
     fname = Path(fname)
     img = Image(fname)
     exif = img.exif
-    date_time = img._date_time
+    date_time = img.get_datetime()
     if date_time is None:
         raise RuntimeError("Unable to get image date-time from exif.")
     try:
@@ -290,6 +319,7 @@ def copy_and_rename(
     base_name: str = "IMG",
     progressive_id: int = None,
     delete_original: bool = False,
+    copy_mode: str = "copy",
 ) -> bool:
     """
     Renames an image file based on its EXIF data and copies it to a specified destination folder.
@@ -298,7 +328,8 @@ def copy_and_rename(
         fname (Union[str, Path]): A string or Path object specifying the file path of the image to rename and copy.
         dest_folder (Union[str, Path], optional): A string or Path object specifying the destination directory path to copy the renamed image to. Defaults to "renamed".
         base_name (str, optional): A string to use as the base name for the renamed image file. Defaults to "IMG".
-        delete_original (bool, optional): Whether to delete the original image file after copying the renamed image. Defaults to False.
+        delete_original (bool, optional): Whether to delete the original image file after copying the renamed image. If True, the image is moved. Defaults to False.
+        copy_mode (str, optional): How the renamed image is created: "copy" (full copy of the data, done by the kernel with copy_file_range on Linux), "hardlink" (new name for the same file, on the same file system), "reflink" (copy-on-write clone with the FICLONE ioctl, on file systems supporting it, otherwise a full copy) or "move" (the original is renamed). Defaults to "copy".
 
     Returns:
         dict: A dictionary containing the extracted EXIF data.
@@ -316,17 +347,130 @@ def copy_and_rename(
         fname=fname, base_name=base_name, progressive_id=progressive_id
     )
 
-    # Do the copy
+    # Do the copy (moving the original if it must be deleted anyway)
     dst = dest_folder / new_name
-    shutil.copyfile(src=fname, dst=dst)
-
-    # If requested, delete original
     if delete_original:
-        fname.unlink()
+        copy_mode = "move"
+    transfer_file(fname, dst, copy_mode)
 
     return dic
 
 
+def rename_images(
+    image_list: Union[ImageList, List[Union[str, Path]]],
+    dest_folder: Union[str, Path] = "renamed",
+    base_name: str = "IMG",
+    progressive_ids: bool = False,
+    delete_original: bool = False,
+    copy_mode: str = "copy",
+    max_workers: int = 4,
+) -> dict:
+    """
+    Renames a list of images based on their EXIF data, as copy_and_rename, overlapping the reading of the EXIF data with the copy of the files: while the EXIF data of an image are read, the previous images are copied by a pool of threads.
+
+    Args:
+        image_list (Union[ImageList, List[Union[str, Path]]]): The images to rename.
+        dest_folder (Union[str, Path], optional): The destination folder for the renamed images. Defaults to "renamed".
+        base_name (str, optional): The base name for the renamed images. Defaults to "IMG".
+        progressive_ids (bool, optional): Whether to add a progressive id (the index of the image in the list) to the new names. Defaults to False.
+        delete_original (bool, optional): Whether to delete the original images (i.e., move them). Defaults to False.
+        copy_mode (str, optional): How the renamed images are created (see copy_and_rename). Defaults to "copy".
+        max_workers (int, optional): Number of threads copying the files. Defaults to 4.
+
+    Returns:
+        dict: A dictionary mapping the index of each image in the list to its RenamingDict.
+
+    Raises:
+        RuntimeError: If the image date-time cannot be retrieved from the exif data.
+    """
+    dest_folder = Path(dest_folder)
+    dest_folder.mkdir(exist_ok=True, parents=True)
+    if delete_original:
+        copy_mode = "move"
+    assert copy_mode in COPY_MODES, f"copy_mode must be one of {COPY_MODES}"
+
+    renaming_dict = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Transfers by destination name: images with the same new name (e.g.,
+        # taken in the same second, without progressive ids) must not be
+        # written at the same time, so each waits for the previous one and,
+        # as when copying one image at a time, the last image wins
+        transfers = {}
+        for i, file in enumerate(tqdm(image_list)):
+            new_name, renaming_dict[i] = name_from_exif(
+                fname=file,
+                base_name=base_name,
+                progressive_id=i if progressive_ids else None,
+            )
+            if new_name in transfers:
+                transfers[new_name].result()
+            transfers[new_name] = executor.submit(
+                transfer_file, Path(file), dest_folder / new_name, copy_mode
+            )
+        # Raise the first error occurred while copying
+        for transfer in transfers.values():
+            transfer.result()
+
+    return renaming_dict
+
+
+def _copy_and_rename_indexed(
+    item: Tuple[int, Union[str, Path]], **kwargs
+) -> Tuple[int, RenamingDict]:
+    """Runs copy_and_rename on an (index, path) pair and returns the index with the result, for unordered parallel renaming."""
+    idx, fname = item
+    return idx, copy_and_rename(fname, **kwargs)
+
+
+def transfer_file(src: Path, dst: Path, copy_mode: str = "copy") -> None:
+    """Create dst from src, overwriting it if it exists, according to copy_mode ("copy", "hardlink", "reflink" or "move", see copy_and_rename)."""
+    assert copy_mode in COPY_MODES, f"copy_mode must be one of {COPY_MODES}"
+    if copy_mode == "move":
+        # Rename within the same file system, copy and delete otherwise
+        shutil.move(src, dst)
+    elif copy_mode == "hardlink":
+        if dst.exists():
+            dst.unlink()
+        os.link(src, dst)
+    elif copy_mode == "reflink" and _reflink(src, dst):
+        return
+    elif not _copy_file_range(src, dst):
+        shutil.copyfile(src=src, dst=dst)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone src into dst with the FICLONE ioctl. Returns False if the platform or the file system does not support it."""
+    try:
+        fcntl = import_module("fcntl")
+    except ImportError:
+        return False
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def _copy_file_range(src: Path, dst: Path) -> bool:
+    """Copy src into dst with os.copy_file_range (Linux only), which copies the data within the kernel and lets the file system clone it (e.g., Btrfs, XFS) or copy it on the server (e.g., NFS). Returns False if the platform or the file system does not support it."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        try:
+            while size > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size)
+                if copied == 0:
+                    # Nothing copied before the end of the data (e.g., on some
+                    # FUSE or pseudo file systems): copy the file otherwise
+                    return False
+                size -= copied
+        except OSError:
+            return False
+    return True
+
+
 def make_previews(
     fname: Union[str, Path],
     dest_folder: Union[str, Path] = "previews",
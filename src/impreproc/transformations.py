@@ -1,4 +1,7 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from importlib import import_module
 from pathlib import Path
 from typing import List, Tuple, Union
@@ -8,6 +11,44 @@ import pyproj
 import rasterio
 from rasterio import Affine
 
+# Minimum number of points processed by each thread in Transformer.transform_parallel
+MIN_POINTS_PER_THREAD = 50000
+# Minimum number of query points interpolated by the numba kernel (if numba is
+# installed), below which its thread start-up costs more than it saves
+NUMBA_MIN_POINTS = 10000
+
+
+@lru_cache(maxsize=None)
+def _get_bilinear_kernel():
+    """Returns the numba kernel of bilinear_interpolate, or None if numba is not installed. numba (and LLVM) is imported only here, on the first interpolation of a large set of points, and the kernel is compiled once (and cached on disk)."""
+    try:
+        numba = import_module("numba")
+    except ImportError:
+        return None
+
+    @numba.njit(cache=True, parallel=True, fastmath=True)
+    def bilinear_kernel(im, x, y, out):
+        # Same interpolation as bilinear_interpolate, one point per iteration
+        # on HxWxC images, without temporary arrays
+        h, w = im.shape[0], im.shape[1]
+        for i in numba.prange(x.shape[0]):
+            x0 = int(np.floor(x[i]))
+            y0 = int(np.floor(y[i]))
+            x1 = min(max(x0 + 1, 0), w - 1)
+            y1 = min(max(y0 + 1, 0), h - 1)
+            x0 = min(max(x0, 0), w - 1)
+            y0 = min(max(y0, 0), h - 1)
+            wx0 = x1 - x[i]
+            wx1 = x[i] - x0
+            wy0 = y1 - y[i]
+            wy1 = y[i] - y0
+            for c in range(im.shape[2]):
+                out[i, c] = wx0 * (wy0 * im[y0, x0, c] + wy1 * im[y1, x0, c]) + wx1 * (
+                    wy0 * im[y0, x1, c] + wy1 * im[y1, x1, c]
+                )
+
+    return bilinear_kernel
+
 
 class Transformer:
     """
@@ -117,6 +158,43 @@ class Transformer:
             )
             return x, y, z_ellh
 
+    def transform_parallel(
+        self,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        ellh: np.ndarray = None,
+        max_workers: int = None,
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Transforms arrays of coordinates by splitting them into chunks that are transformed by a pool of threads. PROJ releases the GIL while transforming, so the chunks are processed in parallel. Arrays with less than 2 * MIN_POINTS_PER_THREAD points are transformed in a single call.
+
+        Args:
+            lat (np.ndarray): Array of latitude coordinates in decimal degrees.
+            lon (np.ndarray): Array of longitude coordinates in decimal degrees.
+            ellh (np.ndarray, optional): Array of ellipsoidal heights in meters. Required if `transform3d` is True.
+            max_workers (int, optional): Maximum number of threads. Defaults to None (number of CPUs).
+
+        Returns:
+            A tuple containing the arrays of the transformed x, y, and z (if `transform3d` is True) coordinates.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        n_chunks = min(max_workers, len(lat) // MIN_POINTS_PER_THREAD)
+        if n_chunks <= 1:
+            return tuple(np.asarray(v) for v in self.transform(lat, lon, ellh))
+
+        coords = [lat, lon]
+        if self.transform3d:
+            assert ellh is not None, "ellh must be provided for 3D transformations"
+            coords.append(np.asarray(ellh, dtype=np.float64))
+        chunks = zip(*[np.array_split(c, n_chunks) for c in coords])
+        with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+            out = list(executor.map(lambda c: self.transform(*c), chunks))
+
+        return tuple(np.concatenate(v) for v in zip(*out))
+
 
 def xy2rc(tform: Affine, x: float, y: float) -> Tuple[float, float]:
     """Converts x, y coordinates to row, column coordinates using an affine transformation, as stored in the rasterio dataset (i.e., the transformation that maps pixel coordinates to world coordinates)
@@ -150,18 +228,39 @@ def rc2xy(tform: Affine, row: float, col: float) -> Tuple[float, float]:
     return xy[0][0], xy[1][0]
 
 
-def bilinear_interpolate(im: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
-    """Performs bilinear interpolation on a 2D array (single channel image given x, y arrays of unstructured query points.
+def bilinear_interpolate(
+    im: np.ndarray, x: np.ndarray, y: np.ndarray, out: np.ndarray = None
+) -> np.ndarray:
+    """Performs bilinear interpolation on a 2D array (single channel image) or on a 3D array (multi-channel image) given x, y arrays of unstructured query points.
+
+    If numba is installed, large sets of query points (at least NUMBA_MIN_POINTS) are interpolated by a compiled kernel running in parallel over the points.
     Args:
-        im (np.ndarray): Single channel image.
+        im (np.ndarray): Single channel (HxW) or multi-channel (HxWxC) image.
         x (np.ndarray): nx1 array of x coordinates of query points.
         y (np.ndarray): nx1 array of y coordinates of query points.
+        out (np.ndarray, optional): Array of the shape of the result (n or nxC), in which the result is written. Defaults to None.
 
     Returns:
-        np.ndarray: nx1 array of the interpolated color.
+        np.ndarray: nx1 array of the interpolated color (nxC for multi-channel images).
     """
     x = np.asarray(x)
     y = np.asarray(y)
+    if x.ndim == 0:
+        # Single query point
+        return bilinear_interpolate(im, x[None], y[None])[0]
+
+    kernel = _get_bilinear_kernel() if x.size >= NUMBA_MIN_POINTS else None
+    if kernel is not None:
+        result = np.empty(
+            (x.size, im.shape[2] if im.ndim == 3 else 1),
+            dtype=np.result_type(im.dtype, x.dtype, y.dtype, np.float32),
+        )
+        kernel(im if im.ndim == 3 else im[..., None], x.ravel(), y.ravel(), result)
+        result = result.reshape(x.shape + im.shape[2:])
+        if out is None:
+            return result
+        out[...] = result
+        return out
 
     x0 = np.floor(x).astype(int)
     x1 = x0 + 1
@@ -173,17 +272,27 @@ def bilinear_interpolate(im: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.nda
     y0 = np.clip(y0, 0, im.shape[0] - 1)
     y1 = np.clip(y1, 0, im.shape[0] - 1)
 
-    Ia = im[y0, x0]
-    Ib = im[y1, x0]
-    Ic = im[y0, x1]
-    Id = im[y1, x1]
-
-    wa = (x1 - x) * (y1 - y)
-    wb = (x1 - x) * (y - y0)
-    wc = (x - x0) * (y1 - y)
-    wd = (x - x0) * (y - y0)
-
-    return wa * Ia + wb * Ib + wc * Ic + wd * Id
+    # Weights along x and y, broadcast over the channels of the samples
+    wx0 = x1 - x
+    wx1 = x - x0
+    wy0 = y1 - y
+    wy1 = y - y0
+    if im.ndim == 3:
+        wx0, wx1, wy0, wy1 = (w[..., None] for w in (wx0, wx1, wy0, wy1))
+
+    # Interpolate along y on the x0 and x1 columns, then along x, reusing the
+    # same buffers instead of allocating a temporary array for each product
+    out = np.multiply(wy0, im[y0, x0], out=out)
+    tmp = np.multiply(wy1, im[y1, x0])
+    out += tmp
+    out *= wx0
+    right = np.multiply(wy0, im[y0, x1])
+    np.multiply(wy1, im[y1, x1], out=tmp)
+    right += tmp
+    right *= wx1
+    out += right
+
+    return out
 
 
 def get_geoid_undulation(geoid_path: Union[str, Path]) -> Tuple[np.ndarray, Affine]:
@@ -7,6 +7,7 @@ Authors: Ayush Baid
 
 import pandas as pd
 
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -27,6 +28,20 @@ class SensorWidthDatabase:
         self.df["CameraMaker"] = self.df["CameraMaker"].str.lower()
         self.df["CameraModel"] = self.df["CameraModel"].str.lower()
 
+        # Index of the sensor widths by (make, model), for O(1) lookups. Pairs
+        # found more than once in the database are left out, as ambiguous.
+        self._widths = {}
+        duplicated = set()
+        for key, width in zip(
+            zip(self.df["CameraMaker"], self.df["CameraModel"]),
+            self.df["SensorWidth(mm)"],
+        ):
+            if key in self._widths:
+                duplicated.add(key)
+            self._widths[key] = width
+        for key in duplicated:
+            del self._widths[key]
+
     def lookup(self, make: str, model: str) -> float:
         """Look-up the sensor width given the camera make and model.
 
@@ -42,16 +57,20 @@ class SensorWidthDatabase:
         lower_make = make.split()[0].lower()
         lower_model = model.lower()
 
-        selection_condition = (self.df["CameraMaker"] == lower_make) & (
-            self.df["CameraModel"] == lower_model
-        )
-        selected = self.df.loc[selection_condition, "SensorWidth(mm)"]
-        if len(selected) != 1:
+        try:
+            return self._widths[(lower_make, lower_model)]
+        except KeyError:
             raise LookupError(
                 f"make='{make}' and model='{model}' not found in sensor database"
             )
 
-        return self.df.loc[selection_condition, "SensorWidth(mm)"].values[0]
+
+@lru_cache(maxsize=None)
+def get_sensor_width_database(
+    csv_path: str = DEFAULT_SENSOR_DB_PATH,
+) -> SensorWidthDatabase:
+    """Returns the SensorWidthDatabase of the given csv file, loaded only once and shared by all the callers."""
+    return SensorWidthDatabase(csv_path)
 
 
 if __name__ == "__main__":
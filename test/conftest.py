@@ -0,0 +1,113 @@
+import struct
+import zlib
+
+import cv2
+import numpy as np
+import pytest
+
+
+def make_ifd(entries, offset, endian):
+    # Build an IFD starting at offset, with the values longer than 4 bytes
+    # stored right after it
+    size = 2 + 12 * len(entries) + 4
+    ifd = struct.pack(endian + "H", len(entries))
+    data = b""
+    for tag, field_type, count, value in entries:
+        if len(value) <= 4:
+            ifd += struct.pack(endian + "HHI", tag, field_type, count)
+            ifd += value.ljust(4, b"\x00")
+        else:
+            ifd += struct.pack(
+                endian + "HHII", tag, field_type, count, offset + size + len(data)
+            )
+            data += value + b"\x00" * (len(value) % 2)
+    return ifd + struct.pack(endian + "I", 0) + data
+
+
+def make_tiff(endian, ifd0_offset=8):
+    # The IFDs are stored at ifd0_offset, after some padding (e.g., image data)
+    def rational(*values):
+        return b"".join(struct.pack(endian + "II", *v) for v in values)
+
+    def long(value):
+        return struct.pack(endian + "I", value)
+
+    gps = [
+        (1, 2, 2, b"N\x00"),
+        (2, 5, 3, rational((45, 1), (57, 1), (55123, 1000))),
+        (3, 2, 2, b"E\x00"),
+        (4, 5, 3, rational((9, 1), (29, 1), (5341, 1000))),
+        (5, 1, 1, b"\x00"),
+        (6, 5, 1, rational((10234, 10))),
+    ]
+    exif = [
+        (0x829A, 5, 1, rational((1, 1000))),  # ExposureTime, not read
+        (0x9003, 2, 20, b"2023:05:12 10:11:12\x00"),
+        (0x920A, 5, 1, rational((44, 5))),
+        (0xA002, 4, 1, long(5472)),
+        (0xA003, 4, 1, long(3648)),
+    ]
+
+    def ifd0(exif_offset, gps_offset):
+        return [
+            (0x0100, 4, 1, long(5472)),
+            (0x0101, 4, 1, long(3648)),
+            (0x010F, 2, 4, b"DJI\x00"),
+            (0x0110, 2, 8, b"FC6310\x00\x00"),
+            (0x0132, 2, 20, b"2023:05:12 10:11:12\x00"),
+            (0x8769, 4, 1, long(exif_offset)),
+            (0x8825, 4, 1, long(gps_offset)),
+        ]
+
+    # The IFDs are built twice, to get the offsets of the EXIF and GPS IFDs
+    exif_offset = ifd0_offset + len(make_ifd(ifd0(0, 0), ifd0_offset, endian))
+    gps_offset = exif_offset + len(make_ifd(exif, exif_offset, endian))
+    header = (b"II*\x00" if endian == "<" else b"MM\x00*") + long(ifd0_offset)
+    return (
+        header
+        + b"\x00" * (ifd0_offset - 8)
+        + make_ifd(ifd0(exif_offset, gps_offset), ifd0_offset, endian)
+        + make_ifd(exif, exif_offset, endian)
+        + make_ifd(gps, gps_offset, endian)
+    )
+
+
+@pytest.fixture(params=["<", ">"])
+def jpeg_file(request, tmp_path):
+    app1 = b"Exif\x00\x00" + make_tiff(request.param)
+    app0 = b"JFIF\x00" + b"\x00" * 9
+    fname = tmp_path / "DJI_0001.JPG"
+    fname.write_bytes(
+        b"\xff\xd8"
+        + b"\xff\xe0"
+        + struct.pack(">H", len(app0) + 2)
+        + app0
+        + b"\xff\xe1"
+        + struct.pack(">H", len(app1) + 2)
+        + app1
+        + b"\xff\xda\x00\x02"
+        + b"\x11" * 1000
+        + b"\xff\xd9"
+    )
+    return fname
+
+
+@pytest.fixture(params=["<", ">"])
+def dng_file(request, tmp_path):
+    # IFDs stored after 1 MB of image data
+    fname = tmp_path / "DJI_0001.DNG"
+    fname.write_bytes(make_tiff(request.param, ifd0_offset=2**20))
+    return fname
+
+
+@pytest.fixture
+def png_file(tmp_path):
+    # EXIF chunk stored after the image data (allowed by the PNG specification)
+    ok, png = cv2.imencode(".png", np.zeros((30, 40, 3), dtype=np.uint8))
+    png = png.tobytes()
+    exif = make_tiff("<")
+    chunk = struct.pack(">I4s", len(exif), b"eXIf") + exif
+    chunk += struct.pack(">I", zlib.crc32(chunk[4:]))
+    fname = tmp_path / "image.png"
+    fname.write_bytes(png[:-12] + chunk + png[-12:])
+    return fname
@@ -1,14 +1,33 @@
+import logging
+import os
+import sys
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 import numpy as np
 import pytest
 
 from impreproc.dji import (
+    columns_from_rows,
+    dji2csv,
+    dji2xlsx,
     get_dji_id_from_name,
     get_images,
+    get_images_exiftool,
+    get_transformer,
     latlonalt_from_exif,
+    latlonalt_from_exiftool,
+    merge_mrk_exif_columns,
     merge_mrk_exif_data,
+    merge_mrk_exif_dataframe,
     mrkread,
+    mrkread_array,
+    mrkread_cached,
+    mrkread_columns,
+    project_columns_to_utm,
+    project_fields_to_utm,
     project_to_utm,
 )
 
@@ -52,15 +71,147 @@ def sample_exif():
     return exif
 
 
+@pytest.fixture
+def mrk_file(tmp_path):
+    lines = [
+        "1\t288490.170360\t[2165]\t    14,N\t    12,E\t    -4,V\t45.96542305,Lat\t9.49817584,Lon\t1023.478,Ellh\t0.012785, 0.010966, 0.024004\t50,Q\n",
+        "2\t288492.170360\t[2165]\t    15,N\t    11,E\t    -3,V\t45.96552305,Lat\t9.49827584,Lon\t1023.512,Ellh\t0.013785, 0.011966, 0.025004\t16,Q\n",
+    ]
+    fname = tmp_path / "test.MRK"
+    fname.write_text("".join(lines))
+
+    return fname
+
+
+@pytest.fixture
+def merged_data():
+    # Example of data merged from .mrk file and EXIF
+    merged = {
+        1: {
+            "id": 1,
+            "clock_time_mrk": 288490.17036,
+            "lat_mrk": 45.96542305,
+            "lon_mrk": 9.49817584,
+            "ellh_mrk": 1023.478,
+            "stdE_mrk": 0.012785,
+            "stdN_mrk": 0.010966,
+            "stdV_mrk": 0.024004,
+            "dE_mrk": 14.0,
+            "dN_mrk": 12.0,
+            "dV_mrk": -4.0,
+            "Qual_mrk": 50.0,
+            "Flag_mrk": "Q",
+            "name_exif": "DJI_0001",
+            "basename_exif": "DJI_0001.JPG",
+            "path_exif": "data/DJI_0001.JPG",
+            "date_exif": "2023:03:03",
+            "time_exif": "10:31:12",
+            "lat_exif": 45.965423,
+            "lon_exif": 9.498176,
+            "ellh_exif": 1023.5,
+        },
+        2: None,
+    }
+    return merged
+
+
+def test_dji2csv(merged_data, tmp_path):
+    fout = tmp_path / "out.csv"
+    assert dji2csv(merged_data, fout, flag_utm=True, scale_factors=[2, 1, 1])
+    lines = fout.read_text().splitlines()
+    assert len(lines) == 2
+    ln = lines[1].split(",")
+    assert ln[1] == "DJI_0001.JPG"
+    assert float(ln[-3]) == pytest.approx(2 * 0.012785, abs=1e-4)
+    assert "E" not in merged_data[1]
+
+
+def test_dji2xlsx(merged_data, tmp_path):
+    for flag_utm in [0, 1]:
+        fout = tmp_path / f"out_{flag_utm}.xlsx"
+        assert dji2xlsx(merged_data, str(fout), flag_utm=flag_utm)
+        assert fout.exists()
+        # In constant_memory mode rows written out of order are silently
+        # dropped: check that all the rows of each sheet are in the file
+        with zipfile.ZipFile(fout) as zf:
+            sheets = [
+                zf.read(f"xl/worksheets/sheet{i}.xml").decode() for i in range(1, 5)
+            ]
+        # EXIF and LOG: header and one image, OUTPUT: header and scale table
+        assert [s.count("<row ") for s in sheets] == [2, 2, 4, 4]
+        assert "DJI_0001" in sheets[0]
+    assert "E_exif" not in merged_data[1]
+
+
 def test_get_dji_id_from_name():
     assert get_dji_id_from_name("DJI_0001.JPG") == 1
     assert get_dji_id_from_name("DJI_0123.JPG") == 123
     assert get_dji_id_from_name("IMG_0123.JPG") == 123
     assert get_dji_id_from_name("dji_0001.JPG") == 1
+    assert get_dji_id_from_name(Path("data/DJI_20230101_0042.JPG")) == 42
+    assert get_dji_id_from_name("DJI_0007") == 7
+
+
+def test_get_images_progress(tmp_path):
+    # Files without EXIF data are reported as None
+    for i in range(1, 4):
+        (tmp_path / f"DJI_{i:04d}.JPG").write_bytes(b"")
+    progress = []
+    exif = get_images(
+        tmp_path,
+        "JPG",
+        use_exiftool=False,
+        progress_callback=lambda i, n: progress.append((i, n)),
+    )
+    assert exif == {1: None, 2: None, 3: None}
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_get_images_without_exiftool(tmp_path, caplog, monkeypatch):
+    # Without pyexiftool, exifread is used without warnings
+    monkeypatch.setitem(sys.modules, "exiftool", None)
+    (tmp_path / "DJI_0001.JPG").write_bytes(b"")
+    with caplog.at_level(logging.WARNING):
+        assert get_images(tmp_path, "JPG") == {1: None}
+    assert "ExifTool" not in caplog.text
+
+
+def test_get_images_exiftool_bad_name(tmp_path, monkeypatch):
+    # A file name without a DJI id does not discard the ExifTool batch
+    class ExifToolHelper:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def get_tags(self, files, tags):
+            return [
+                {
+                    "EXIF:GPSLatitudeRef": "N",
+                    "EXIF:GPSLatitude": 45.5,
+                    "EXIF:GPSLongitudeRef": "E",
+                    "EXIF:GPSLongitude": 9.2,
+                    "EXIF:GPSAltitudeRef": 0,
+                    "EXIF:GPSAltitude": 100.0,
+                    "EXIF:DateTimeOriginal": "2023:05:12 10:11:12",
+                }
+                for _ in files
+            ]
+
+    monkeypatch.setitem(
+        sys.modules, "exiftool", SimpleNamespace(ExifToolHelper=ExifToolHelper)
+    )
+    files = [tmp_path / "DJI_0001.JPG", tmp_path / "image.JPG"]
+    exif = get_images_exiftool(files)
+    assert exif[1]["lat"] == 45.5
+    assert exif[None] is None
 
 
 def test_latlonalt_from_exif(sample_exif):
     lat, lon, alt = latlonalt_from_exif(sample_exif)
+    assert all(type(x) is float for x in (lat, lon, alt))
+    assert lat == pytest.approx(37 + 49 / 60 + 30.312 / 3600, rel=1e-12)
     assert lat == pytest.approx(37.825087, rel=1e-6)
     assert lon == pytest.approx(122.468316, rel=1e-6)
     assert alt == pytest.approx(17.4, rel=1e-6)
@@ -84,6 +235,147 @@ def test_latlonalt_from_exif(sample_exif):
         latlonalt_from_exif(sample_exif)
 
 
+def test_latlonalt_from_exiftool():
+    tags = {
+        "EXIF:GPSLatitudeRef": "N",
+        "EXIF:GPSLatitude": 37.825087,
+        "EXIF:GPSLongitudeRef": "E",
+        "EXIF:GPSLongitude": 122.468316,
+        "EXIF:GPSAltitudeRef": 0,
+        "EXIF:GPSAltitude": 17.4,
+    }
+    lat, lon, alt = latlonalt_from_exiftool(tags)
+    assert lat == pytest.approx(37.825087, rel=1e-6)
+    assert lon == pytest.approx(122.468316, rel=1e-6)
+    assert alt == pytest.approx(17.4, rel=1e-6)
+
+    with pytest.raises(AssertionError):
+        tags["EXIF:GPSLatitudeRef"] = "S"
+        latlonalt_from_exiftool(tags)
+
+
+def test_merge_mrk_exif_data(merged_data):
+    ref = merged_data[1]
+    mrk = {k[: -len("_mrk")]: v for k, v in ref.items() if k.endswith("_mrk")}
+    mrk["id"] = 1
+    exif = {k[: -len("_exif")]: v for k, v in ref.items() if k.endswith("_exif")}
+    exif["id"] = 1
+    mrk_dict = {1: mrk, 2: dict(mrk, id=2), 3: dict(mrk, id=3)}
+    exif_dict = {1: exif, 2: None}
+
+    merged = merge_mrk_exif_data(mrk_dict, exif_dict)
+    assert list(merged.keys()) == [1, 2, 3]
+    assert merged[1] == ref
+    assert merged[2] is None
+    assert merged[3] is None
+
+
+def test_merge_mrk_exif_columns(mrk_file):
+    mrk_dict = mrkread(mrk_file)
+    exif_dict = {
+        2: {"id": 2, "name": "DJI_0002", "lat": 45.9655, "lon": 9.4983},
+        1: {"id": 1, "name": "DJI_0001", "lat": 45.9654, "lon": 9.4982},
+        5: None,
+    }
+    exif_columns = columns_from_rows(exif_dict)
+    assert exif_columns["id"].tolist() == [2, 1]
+    assert exif_columns["name"].tolist() == ["DJI_0002", "DJI_0001"]
+
+    merged = merge_mrk_exif_columns(mrkread_columns(mrk_file), exif_columns)
+    ref = merge_mrk_exif_data(mrk_dict, exif_dict)
+    assert merged["id"].tolist() == [1, 2]
+    for i, id in enumerate(merged["id"].tolist()):
+        assert {k: v[i].item() for k, v in merged.items()} == ref[id]
+
+    # Only the images with both MRK and EXIF data are kept
+    merged = merge_mrk_exif_columns(
+        mrkread_columns(mrk_file), columns_from_rows({2: exif_dict[2]})
+    )
+    assert merged["id"].tolist() == [2]
+    assert merged["lat_exif"].tolist() == [45.9655]
+
+
+def test_merge_mrk_exif_dataframe(mrk_file):
+    exif_dict = {
+        1: {"id": 1, "name": "DJI_0001", "lat": 45.9654, "lon": 9.4982},
+        2: {"id": 2, "name": "DJI_0002", "lat": 45.9655, "lon": 9.4983},
+    }
+    df = merge_mrk_exif_dataframe(
+        mrkread_columns(mrk_file), columns_from_rows(exif_dict)
+    )
+    ref = merge_mrk_exif_data(mrkread(mrk_file), exif_dict)
+    assert df.index.tolist() == [1, 2]
+    assert df.index.name == "id"
+    assert df.loc[2, "lat_mrk"] == ref[2]["lat_mrk"]
+    assert df.loc[2, "name_exif"] == "DJI_0002"
+    assert df.columns.tolist() == [k for k in ref[1] if k != "id"]
+
+
+def test_mrkread(mrk_file):
+    data = mrkread(mrk_file)
+    assert list(data.keys()) == [1, 2]
+    assert data[1]["id"] == 1
+    assert data[1]["clock_time"] == 288490.170360
+    assert data[1]["lat"] == 45.96542305
+    assert data[1]["lon"] == 9.49817584
+    assert data[1]["ellh"] == 1023.478
+    assert data[1]["dE"] == 14
+    assert data[1]["dN"] == 12
+    assert data[1]["dV"] == -4
+    assert data[1]["stdE"] == 0.012785
+    assert data[2]["stdV"] == 0.025004
+    assert data[2]["Qual"] == 16
+    assert data[2]["Flag"] == "Q"
+    assert all(isinstance(data[1][k], float) for k in ["lat", "lon", "stdE", "Qual"])
+
+
+def test_mrkread_cached(mrk_file):
+    data = mrkread_cached(mrk_file)
+    assert data == mrkread(mrk_file)
+    assert mrkread_cached(str(mrk_file)) is data
+
+    # The file is parsed again when it changes
+    lines = mrk_file.read_text().splitlines(keepends=True)
+    mrk_file.write_text(lines[0])
+    st = os.stat(mrk_file)
+    os.utime(mrk_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert list(mrkread_cached(mrk_file)) == [1]
+
+
+def test_mrkread_array(mrk_file):
+    arr = mrkread_array(mrk_file)
+    data = mrkread(mrk_file)
+    assert arr.shape == (2,)
+    assert arr["id"].tolist() == [1, 2]
+    assert np.allclose(arr["lat"], [data[1]["lat"], data[2]["lat"]])
+    assert arr["Flag"].tolist() == ["Q", "Q"]
+
+    # Pipes are handled as field delimiters, like tabs
+    piped = mrk_file.with_name("piped.MRK")
+    piped.write_text(mrk_file.read_text().replace("\t", "|"))
+    assert np.array_equal(mrkread_array(piped), arr)
+
+
+def test_mrkread_columns(mrk_file):
+    data = mrkread_columns(mrk_file)
+    assert list(data.keys()) == list(mrkread(mrk_file)[1].keys())
+    assert data["id"].tolist() == [1, 2]
+    assert data["lat"].dtype == np.float64
+    assert data["lat"].flags["C_CONTIGUOUS"]
+    assert data["Qual"].tolist() == [50, 16]
+
+
+def test_get_transformer():
+    transformer = get_transformer(4326, 32632)
+    assert get_transformer(4326, 32632) is transformer
+    assert get_transformer(4326, 32633) is not transformer
+
+    # Input in lat, lon order (EPSG:4326), output in E, N order (UTM)
+    e, n = transformer.transform(45.477059, 9.186755)
+    assert np.isclose(e, 514596.494, rtol=1e-6)
+    assert np.isclose(n, 5035964.792, rtol=1e-6)
+
+
 def test_project_to_utm():
     data_dict = {
         1: {"id": 1, "lat": 45.477059, "lon": 9.186755, "ellh": 100.0},
@@ -99,6 +391,9 @@ def test_project_to_utm():
     assert np.isclose(out[1]["N"], 5035964.792, rtol=1e-3)
     assert np.isclose(out[1]["E"], 514596.494, rtol=1e-3)
     assert np.isclose(out[1]["ellh"], 100.0, rtol=1e-5)
+    # The input rows are copied, not modified
+    assert out[1] is not data_dict[1]
+    assert "E" not in data_dict[1] and "N" not in data_dict[1]
 
     # Test for inplace conversion
     project_to_utm(epsg_from, epsg_to, data_dict, in_place=True)
@@ -131,6 +426,9 @@ def test_project_to_utm():
     except AssertionError as e:
         assert str(e) == "Three fields must be specified"
 
+    # Test for fields not present in data_dict
+    assert project_to_utm(4326, 32632, data_dict, ["lat", "lon", "h_missing"]) is None
+
     # Test for non-string fields
     epsg_from = 4326
     epsg_to = 32632
@@ -141,6 +439,60 @@ def test_project_to_utm():
         assert str(e) == "Fields must be strings"
 
 
+def test_project_to_utm_batch():
+    # Rows are projected in a single batch: check that the results are
+    # scattered back to the right rows when some of them are None
+    lat = np.linspace(45.0, 46.0, 7)
+    lon = np.linspace(9.0, 10.0, 7)
+    data_dict = {
+        i: (None if i % 3 == 0 else {"lat": lat[i], "lon": lon[i]}) for i in range(7)
+    }
+    out = project_to_utm(4326, 32632, data_dict)
+
+    transformer = get_transformer(4326, 32632)
+    for i, row in out.items():
+        if i % 3 == 0:
+            assert row is None
+            continue
+        E, N = transformer.transform(lat[i], lon[i])
+        assert np.isclose(row["E"], E) and np.isclose(row["N"], N)
+        assert "E" not in data_dict[i]
+
+
+def test_project_fields_to_utm():
+    data_dict = {
+        1: {"lat_a": 45.477059, "lon_a": 9.186755, "lat_b": 45.5, "lon_b": 9.2},
+        2: None,
+    }
+    expected_a = project_to_utm(4326, 32632, data_dict, ["lat_a", "lon_a"])
+    expected_b = project_to_utm(4326, 32632, data_dict, ["lat_b", "lon_b"])
+
+    assert project_fields_to_utm(
+        4326,
+        32632,
+        data_dict,
+        fields=[["lat_a", "lon_a"], ["lat_b", "lon_b"]],
+        suffixes=["_a", "_b"],
+    )
+    assert data_dict[2] is None
+    assert data_dict[1]["E_a"] == expected_a[1]["E"]
+    assert data_dict[1]["N_a"] == expected_a[1]["N"]
+    assert data_dict[1]["E_b"] == expected_b[1]["E"]
+    assert data_dict[1]["N_b"] == expected_b[1]["N"]
+
+
+def test_project_columns_to_utm(mrk_file):
+    columns = mrkread_columns(mrk_file)
+    data = mrkread(mrk_file)
+    assert project_columns_to_utm(4326, 32632, columns, suffix="_mrk")
+    project_to_utm(4326, 32632, data, suffix="_mrk", in_place=True)
+    assert np.allclose(columns["E_mrk"], [data[1]["E_mrk"], data[2]["E_mrk"]])
+    assert np.allclose(columns["N_mrk"], [data[1]["N_mrk"], data[2]["N_mrk"]])
+
+    assert not project_columns_to_utm(4326, 32632, columns, ["lat", "missing"])
+    assert not project_columns_to_utm(32632, 4326, columns)
+
+
 if __name__ == "__main__":
     # data_dir = "data/matrice/DJI_202303031031_001"
     # image_ext = "JPG"
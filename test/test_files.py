@@ -0,0 +1,35 @@
+import pytest
+
+from impreproc.files import organize_files
+
+
+@pytest.fixture
+def files_dir(tmp_path):
+    for name in ["a.JPG", "b.jpeg", "c.dng", "d.png", "notes.txt", "README"]:
+        (tmp_path / name).write_text(name)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "e.jpg").write_text("e.jpg")
+    return tmp_path
+
+
+@pytest.mark.parametrize("inplace", [True, False])
+def test_organize_files(files_dir, inplace):
+    rules = {"Images": ["jpg", "JPEG"], "raw": ["dng"], "tif": ["tif"]}
+    organize_files(files_dir, rules=rules, inplace=inplace)
+
+    # Extensions are matched case-insensitively, in directories named after
+    # the rules, created only if needed
+    assert sorted(p.name for p in (files_dir / "Images").iterdir()) == [
+        "a.JPG",
+        "b.jpeg",
+    ]
+    assert (files_dir / "raw" / "c.dng").read_text() == "c.dng"
+    assert not (files_dir / "tif").exists()
+
+    # Moved or copied
+    for name in ["a.JPG", "b.jpeg", "c.dng"]:
+        assert (files_dir / name).exists() != inplace
+
+    # Files without a rule and subdirectories are left as they are
+    for name in ["d.png", "notes.txt", "README", "sub/e.jpg"]:
+        assert (files_dir / name).exists()
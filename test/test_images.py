@@ -0,0 +1,178 @@
+import cv2
+import exifread
+import numpy as np
+import pytest
+
+from impreproc.images import (
+    Image,
+    ImageList,
+    read_exif_fast,
+    read_image,
+    read_image_list,
+    read_image_size,
+    read_jpeg_size,
+)
+from impreproc.utils.sensor_width_database import get_sensor_width_database
+
+
+def test_read_exif_fast(jpeg_file):
+    exif = read_exif_fast(jpeg_file)
+    with open(jpeg_file, "rb") as f:
+        reference = exifread.process_file(f, details=False)
+
+    assert len(exif) == 15
+    assert "EXIF ExposureTime" not in exif
+    for key, tag in exif.items():
+        assert tag.values == reference[key].values
+        assert tag.printable == reference[key].printable
+    assert float(exif["EXIF FocalLength"].values[0]) == 8.8
+
+
+def test_read_exif_fast_tiff(dng_file):
+    exif = read_exif_fast(dng_file)
+    assert exif["Image Model"].printable == "FC6310"
+    assert float(exif["EXIF FocalLength"].values[0]) == 8.8
+    assert exif["GPS GPSLatitudeRef"].values == "N"
+
+
+def test_read_exif_fast_png(png_file):
+    exif = read_exif_fast(png_file)
+    with open(png_file, "rb") as f:
+        reference = exifread.process_file(f, details=False)
+
+    assert exif["Image Model"].printable == "FC6310"
+    for key, tag in exif.items():
+        assert tag.values == reference[key].values
+
+
+def test_read_exif_fast_unsupported(tmp_path):
+    # JPEG without EXIF
+    fname = tmp_path / "no_exif.jpg"
+    fname.write_bytes(b"\xff\xd8\xff\xda\x00\x02" + b"\x11" * 100 + b"\xff\xd9")
+    assert read_exif_fast(fname) == {}
+
+    # Not an image: left to exifread
+    fname = tmp_path / "text.jpg"
+    fname.write_text("not an image")
+    assert read_exif_fast(fname) is None
+
+
+def test_image_fast_exif(jpeg_file):
+    img = Image(jpeg_file)
+    # EXIF data are read on first access
+    assert not img._exif_loaded
+    assert img.name == "DJI_0001.JPG"
+    assert not img._exif_loaded
+    assert (img.width, img.height) == (5472, 3648)
+    assert img._exif_loaded
+    assert img.date == "2023:05:12"
+    assert img.time == "10:11:12"
+
+    img = Image(jpeg_file, fast_exif=False)
+    assert "EXIF ExposureTime" in img.exif
+
+
+def test_read_image_list(tmp_path):
+    for folder in ["", "a", "a/b", "c"]:
+        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+        for name in ["DJI_0001.JPG", "DJI_0002.jpg", "DJI_0001.MRK"]:
+            (tmp_path / folder / name).touch()
+
+    files = read_image_list(tmp_path, "jpg")
+    assert files == [tmp_path / "DJI_0001.JPG", tmp_path / "DJI_0002.jpg"]
+
+    files = read_image_list(tmp_path, "jpg", recursive=True)
+    assert len(files) == 8
+    assert files == sorted(files)
+    assert tmp_path / "a" / "b" / "DJI_0002.jpg" in files
+
+
+def test_read_image_list_symlinks(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "DJI_0001.JPG").touch()
+    # Links to an ancestor and to a sibling directory are not followed
+    (tmp_path / "a" / "loop").symlink_to(tmp_path, target_is_directory=True)
+    (tmp_path / "b").symlink_to(tmp_path / "a", target_is_directory=True)
+
+    files = read_image_list(tmp_path, "jpg", recursive=True)
+    assert files == [tmp_path / "a" / "DJI_0001.JPG"]
+
+
+def test_prefetch(tmp_path):
+    for i in range(20):
+        (tmp_path / f"DJI_{i:04d}.JPG").write_bytes(bytes([i]) * 10)
+
+    image_list = ImageList(tmp_path, "jpg")
+    prefetched = list(image_list.prefetch(n=4))
+    assert [path for path, _ in prefetched] == image_list.files
+    assert all(data == bytes([i]) * 10 for i, (_, data) in enumerate(prefetched))
+
+
+def test_read_image_size(tmp_path):
+    fname = tmp_path / "image.png"
+    cv2.imwrite(str(fname), np.zeros((30, 40, 3), dtype=np.uint8))
+    assert read_image_size(fname) == (40, 30)
+
+    # The size is read from the file when it is not in the EXIF data
+    img = Image(fname)
+    assert (img.width, img.height) == (40, 30)
+
+
+def test_undistort_image(tmp_path):
+    fname = tmp_path / "image.png"
+    image = np.zeros((30, 40, 3), dtype=np.uint8)
+    image[..., 2] = 255  # red in BGR
+    cv2.imwrite(str(fname), image)
+    K = np.array([[50.0, 0, 20], [0, 50.0, 15], [0, 0, 1]])
+
+    # Without distortion, the image is returned unchanged (in BGR order)
+    img = Image(fname)
+    assert np.array_equal(img.undistort_image(K, np.zeros(5)), image)
+    img.read_image()
+    assert np.array_equal(img.undistort_image(K, np.zeros(5)), image)
+
+    # The full image is undistorted, whatever was read before
+    img.read_image(crop=[0, 0, 10, 10])
+    assert np.array_equal(img.undistort_image(K, np.zeros(5)), image)
+
+
+def test_read_image_crop(tmp_path):
+    fname = tmp_path / "image.png"
+    image = np.random.default_rng(0).integers(0, 255, (30, 40, 3), dtype=np.uint8)
+    cv2.imwrite(str(fname), image)
+    rgb = image[..., ::-1]
+
+    assert np.array_equal(read_image(fname), rgb)
+    assert np.array_equal(read_image(fname, crop=[5, 2, 25, 12]), rgb[2:12, 5:25])
+    assert np.array_equal(Image(fname).extract_patch([5, 2, 25, 12]), rgb[2:12, 5:25])
+
+    resized, scales = read_image(fname, resize=[20, 15], crop=[1, 2, 10, 12])
+    expected = cv2.resize(image, (20, 15))[2:12, 1:10, ::-1]
+    assert np.array_equal(resized, expected)
+    assert scales == (2.0, 2.0)
+
+
+def test_read_image_reduced(tmp_path):
+    fname = tmp_path / "image.jpg"
+    image = np.zeros((600, 800, 3), dtype=np.uint8)
+    image[:, :400] = 255
+    cv2.imwrite(str(fname), image)
+    assert read_jpeg_size(fname) == (800, 600)
+
+    # Decoded at 1/4 of the resolution and resized
+    resized, scales = read_image(fname, resize=[160])
+    assert resized.shape == (120, 160, 3)
+    assert scales == (5.0, 5.0)
+    assert resized[:, :75].min() > 250 and resized[:, 85:].max() < 5
+
+    resized, scales = read_image(fname, color=False, resize=[400, 300])
+    assert resized.shape == (300, 400)
+    assert scales == (2.0, 2.0)
+
+
+def test_sensor_width_database():
+    db = get_sensor_width_database()
+    assert get_sensor_width_database() is db
+    assert db.lookup("NIKON CORPORATION", "NIKON D800") == pytest.approx(35.9)
+    with pytest.raises(LookupError):
+        db.lookup("DJI", "not a camera")
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from impreproc.renaming import ImageRenamer, rename_images, transfer_file
+
+
+@pytest.mark.parametrize("copy_mode", ["copy", "hardlink", "reflink", "move"])
+def test_transfer_file(tmp_path, copy_mode):
+    src = tmp_path / "DJI_0001.JPG"
+    src.write_bytes(b"image data")
+    dst = tmp_path / "IMG_0001.JPG"
+    dst.write_bytes(b"old")
+
+    transfer_file(src, dst, copy_mode)
+    assert dst.read_bytes() == b"image data"
+    assert src.exists() == (copy_mode != "move")
+    if copy_mode == "hardlink":
+        assert src.samefile(dst)
+
+
+def test_rename_images(tmp_path, jpeg_file):
+    files = []
+    for i in range(3):
+        fname = tmp_path / f"DJI_000{i}.JPG"
+        fname.write_bytes(jpeg_file.read_bytes())
+        files.append(fname)
+
+    dest_folder = tmp_path / "renamed"
+    renaming_dict = rename_images(files, dest_folder, progressive_ids=True)
+    assert [d["old_name"] for d in renaming_dict.values()] == [f.name for f in files]
+    assert renaming_dict[1]["new_name"] == "IMG_0001_20230512_101112_FC6310.JPG"
+    for d in renaming_dict.values():
+        assert (dest_folder / d["new_name"]).read_bytes() == jpeg_file.read_bytes()
+    assert all(f.exists() for f in files)
+
+
+def test_image_renamer_parallel(tmp_path, jpeg_file):
+    files = []
+    for i in range(10):
+        fname = tmp_path / f"DJI_{i:04d}.JPG"
+        fname.write_bytes(jpeg_file.read_bytes())
+        files.append(fname)
+
+    renamer = ImageRenamer(files, dest_folder=tmp_path / "renamed", parallel=True)
+    renaming_df = renamer.rename()
+    assert list(renaming_df["old_name"]) == [f.name for f in files]
+    assert (tmp_path / "renamed" / renaming_df["new_name"][0]).exists()
+
+
+@pytest.mark.parametrize("copy_mode", ["copy", "hardlink"])
+def test_rename_images_same_name(tmp_path, jpeg_file, copy_mode):
+    # Images taken in the same second get the same name: the last one wins
+    files = []
+    for i in range(6):
+        fname = tmp_path / f"DJI_{i:04d}.JPG"
+        fname.write_bytes(jpeg_file.read_bytes() + bytes([i]))
+        files.append(fname)
+
+    dest_folder = tmp_path / "renamed"
+    renaming_dict = rename_images(files, dest_folder, copy_mode=copy_mode)
+    assert len({d["new_name"] for d in renaming_dict.values()}) == 1
+    renamed = list(dest_folder.iterdir())
+    assert len(renamed) == 1
+    assert renamed[0].read_bytes() == files[-1].read_bytes()
+
+
+def test_transfer_file_copy_fallback(tmp_path, monkeypatch):
+    # copy_file_range copying nothing falls back to a regular copy
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+    src = tmp_path / "DJI_0001.JPG"
+    src.write_bytes(b"image data")
+    dst = tmp_path / "IMG_0001.JPG"
+    transfer_file(src, dst, "copy")
+    assert dst.read_bytes() == b"image data"
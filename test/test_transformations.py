@@ -3,7 +3,8 @@ from affine import Affine
 from typing import Tuple
 import numpy as np
 
-from impreproc.transformations import xy2rc, rc2xy, bilinear_interpolate
+import impreproc.transformations as transformations
+from impreproc.transformations import Transformer, xy2rc, rc2xy, bilinear_interpolate
 
 
 @pytest.fixture
@@ -32,6 +33,17 @@ def test_rc2xy(tform):
     ), "  rc2xy failed"
 
 
+def test_transform_parallel(monkeypatch):
+    monkeypatch.setattr(transformations, "MIN_POINTS_PER_THREAD", 100)
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(45.0, 46.0, 1000)
+    lon = rng.uniform(9.0, 10.0, 1000)
+    transformer = Transformer(4326, 32632)
+    x, y = transformer.transform(lat, lon)
+    x_par, y_par = transformer.transform_parallel(lat, lon, max_workers=4)
+    assert np.allclose(x, x_par) and np.allclose(y, y_par)
+
+
 # def test_bilinear_interpolate():
 #     # Create a simple test image
 #     im = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8]], dtype=np.float32)
@@ -49,3 +61,40 @@ def test_rc2xy(tform):
 #     result = bilinear_interpolate(im, x, y)
 #     expected = np.array([1.0, 4.0, 7.0])
 #     assert np.allclose(result, expected)
+
+
+def test_bilinear_interpolate_channels():
+    im = np.arange(12, dtype=np.float32).reshape(3, 4)
+    x = np.array([0.5, 1.25, 2.0])
+    y = np.array([0.5, 1.5, 1.0])
+    result = bilinear_interpolate(im, x, y)
+    assert np.allclose(result, [2.5, 7.25, 6.0])
+    assert np.isclose(bilinear_interpolate(im, 0.5, 0.5), 2.5)
+
+    # Channels are interpolated independently
+    im_rgb = np.stack([im, 2 * im, im + 1], axis=-1)
+    result_rgb = bilinear_interpolate(im_rgb, x, y)
+    assert result_rgb.shape == (3, 3)
+    assert np.allclose(result_rgb, np.stack([result, 2 * result, result + 1], -1))
+
+
+@pytest.mark.parametrize("shape", [(30, 40), (30, 40, 3)])
+def test_bilinear_interpolate_numba(monkeypatch, shape):
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(0)
+    im = rng.integers(0, 255, shape).astype(np.float32)
+    # Query points also outside of the image, to check the clipping
+    x = rng.uniform(-5, 45, 2000)
+    y = rng.uniform(-5, 35, 2000)
+
+    monkeypatch.setattr(transformations, "NUMBA_MIN_POINTS", 10**9)
+    expected = bilinear_interpolate(im, x, y)
+    monkeypatch.setattr(transformations, "NUMBA_MIN_POINTS", 1)
+    assert transformations._get_bilinear_kernel() is not None
+    result = bilinear_interpolate(im, x, y)
+    assert result.shape == expected.shape
+    assert np.allclose(result, expected)
+
+    out = np.empty_like(expected)
+    assert bilinear_interpolate(im, x, y, out=out) is out
+    assert np.allclose(out, expected)